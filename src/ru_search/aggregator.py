@@ -239,7 +239,7 @@ class DataQualityAssessor:
         
         # Error disclosure
         if errors:
-            error_sources = ", ".join([error['source'] for error in errors])
+            error_sources = ", ".join(error['source'] for error in errors)
             disclosure_parts.append(f"⚠️ Ошибки при получении данных с: {error_sources}")
             
         # Freshness disclosure
@@ -365,11 +365,8 @@ class MarketDataAggregator:
         self.cache_ttl = cache_ttl
         self.max_workers = max_workers
          
-        # Initialize data sources
-        self.wildberries = WildberriesSearch()
-        self.ozon = OzonSearch()
-        self.yandex = YandexSearch()
-        self.google_trends = GoogleTrendsAPI()
+        # Data sources are created lazily on first use (see _get_source)
+        self._sources: Dict[str, DataSource] = {}
          
         # Initialize cache
         self.cache = SearchCache(ttl=cache_ttl)
@@ -380,18 +377,83 @@ class MarketDataAggregator:
         # Thread pool for parallel execution
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
          
-        # Available sources with tier information
+        # Available sources with factory and tier information
         self.available_sources = {
-            'wildberries': {'instance': self.wildberries, 'tier': 1},
-            'ozon': {'instance': self.ozon, 'tier': 1},
-            'yandex': {'instance': self.yandex, 'tier': 1},
-            'google_trends': {'instance': self.google_trends, 'tier': 2}
+            'wildberries': {'factory': WildberriesSearch, 'tier': 1},
+            'ozon': {'factory': OzonSearch, 'tier': 1},
+            'yandex': {'factory': YandexSearch, 'tier': 1},
+            'google_trends': {'factory': GoogleTrendsAPI, 'tier': 2}
         }
         
         # Logger
         self.logger = logging.getLogger('MarketDataAggregator')
         self.logger.setLevel(logging.INFO)
      
+    def _get_source(self, source_name: str) -> DataSource:
+        """
+        Get the data source instance for a source name, creating it on first use.
+        
+        Args:
+            source_name: Name of the data source
+            
+        Returns:
+            DataSource instance
+        """
+        source = self._sources.get(source_name)
+        if source is None:
+            source = self.available_sources[source_name]['factory']()
+            self._sources[source_name] = source
+        return source
+     
+    async def _aget_source(self, source_name: str) -> DataSource:
+        """
+        Get the data source instance for a source name without blocking the event loop.
+        
+        A source is created on first use in the executor, since some
+        constructors (GoogleTrendsAPI's) perform network I/O.
+        
+        Args:
+            source_name: Name of the data source
+            
+        Returns:
+            DataSource instance
+            
+        Raises:
+            Exception: If the data source cannot be created
+        """
+        source = self._sources.get(source_name)
+        if source is None:
+            loop = asyncio.get_running_loop()
+            created = await loop.run_in_executor(
+                self.executor,
+                self.available_sources[source_name]['factory']
+            )
+            # Another search may have created the source while this one waited
+            source = self._sources.setdefault(source_name, created)
+            if source is not created:
+                created.close()
+        return source
+     
+    @property
+    def wildberries(self) -> WildberriesSearch:
+        """Wildberries data source."""
+        return self._get_source('wildberries')
+     
+    @property
+    def ozon(self) -> OzonSearch:
+        """Ozon data source."""
+        return self._get_source('ozon')
+     
+    @property
+    def yandex(self) -> YandexSearch:
+        """Yandex data source."""
+        return self._get_source('yandex')
+     
+    @property
+    def google_trends(self) -> GoogleTrendsAPI:
+        """Google Trends data source."""
+        return self._get_source('google_trends')
+     
     async def search(
         self, 
         query: str, 
@@ -419,6 +481,7 @@ class MarketDataAggregator:
             - 'summary': Summary statistics
             - 'source_results': Results grouped by source
             - 'errors': Any errors encountered during search
+            - 'error_sources': Frozenset of source names that failed
             - 'data_quality': Data quality assessment
             - 'disclosure': Honest disclosure message
             - 'citations': Source citations with transparency
@@ -432,27 +495,38 @@ class MarketDataAggregator:
         else:
             sources_to_use = [source for source in sources if source in self.available_sources]
          
-        # Prepare tasks for parallel execution
-        tasks = []
-        for source_name in sources_to_use:
-            source_info = self.available_sources[source_name]
-            source = source_info['instance']
-            task = asyncio.create_task(
-                self._search_source(source_name, source, query, use_cache, fallback_to_cache)
-            )
-            tasks.append(task)
-         
-        # Execute tasks with timeout
-        try:
-            results = await asyncio.wait_for(
-                asyncio.gather(*tasks, return_exceptions=True), 
-                timeout=timeout
-            )
-        except asyncio.TimeoutError:
-            # Cancel all tasks if timeout occurs
-            for task in tasks:
-                task.cancel()
-            raise Exception(f"Search operation timed out after {timeout} seconds")
+        if len(sources_to_use) == 1:
+            # Single source: await it directly, skipping task and gather overhead
+            source_name = sources_to_use[0]
+            try:
+                async with asyncio.timeout(timeout):
+                    results = [
+                        await self._search_source(source_name, query, use_cache, fallback_to_cache)
+                    ]
+            except TimeoutError:
+                raise Exception(f"Search operation timed out after {timeout} seconds")
+            except Exception as e:
+                results = [e]
+        else:
+            # Prepare tasks for parallel execution
+            tasks = []
+            for source_name in sources_to_use:
+                task = asyncio.create_task(
+                    self._search_source(source_name, query, use_cache, fallback_to_cache)
+                )
+                tasks.append(task)
+             
+            # Execute tasks with timeout
+            try:
+                results = await asyncio.wait_for(
+                    asyncio.gather(*tasks, return_exceptions=True), 
+                    timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                # Cancel all tasks if timeout occurs
+                for task in tasks:
+                    task.cancel()
+                raise Exception(f"Search operation timed out after {timeout} seconds")
          
         # Process results
         all_products = []
@@ -501,8 +575,9 @@ class MarketDataAggregator:
             all_products, sources_to_use, errors, cache_hits, data_age, source_data
         )
          
-        # Add timing information
-        summary['execution_time'] = time.time() - start_time
+        # Add timing information (one clock read shared with the result timestamp)
+        finished_at = time.time()
+        summary['execution_time'] = finished_at - start_time
          
         return {
             'query': query,
@@ -510,16 +585,16 @@ class MarketDataAggregator:
             'summary': summary,
             'source_results': source_results,
             'errors': errors,
+            'error_sources': frozenset(error['source'] for error in errors),
             'data_quality': data_quality,
             'disclosure': data_quality['disclosure_message'],
             'citations': data_quality['citation_format'],
-            'timestamp': time.time()
+            'timestamp': finished_at
         }
      
     async def _search_source(
         self, 
         source_name: str, 
-        source: DataSource, 
         query: str, 
         use_cache: bool,
         fallback_to_cache: bool
@@ -529,7 +604,6 @@ class MarketDataAggregator:
         
         Args:
             source_name: Name of the data source
-            source: DataSource instance
             query: Search query string
             use_cache: Whether to use cached results
             fallback_to_cache: Whether to use cached data if API fails
@@ -557,6 +631,9 @@ class MarketDataAggregator:
          
         # Tier 2: If not in cache or caching disabled, perform actual search
         try:
+            # A source that cannot be created fails like its search would
+            source = await self._aget_source(source_name)
+            
             # Run the search in a thread to avoid blocking the event loop
             loop = asyncio.get_running_loop()
             products = await loop.run_in_executor(
@@ -565,11 +642,13 @@ class MarketDataAggregator:
                 query
             )
              
+            fetched_at = time.time()
+            
             # Cache the results
             if use_cache:
                 cache_data = {
                     'products': products,
-                    'timestamp': time.time(),
+                    'timestamp': fetched_at,
                     'query': query,
                     'source': source_name
                 }
@@ -577,7 +656,7 @@ class MarketDataAggregator:
                 
             source_info = {
                 'products': products,
-                'timestamp': time.time(),
+                'timestamp': fetched_at,
                 'source': source_name,
                 'cache_hit': False
             }
@@ -725,10 +804,8 @@ class MarketDataAggregator:
         # Prepare tasks for parallel execution
         tasks = []
         for source_name in sources_to_use:
-            source_info = self.available_sources[source_name]
-            source = source_info['instance']
             task = asyncio.create_task(
-                self._get_trends_source(source_name, source, query)
+                self._get_trends_source(source_name, query)
             )
             tasks.append(task)
          
@@ -776,20 +853,20 @@ class MarketDataAggregator:
             if 'trend_score' in trend_results[source]
         ]
         average_trend_score = sum(valid_scores) / len(valid_scores) if valid_scores else 0.0
+        finished_at = time.time()
          
         return {
             'query': query,
             'trend_results': trend_results,
             'average_trend_score': round(average_trend_score, 3),
             'errors': errors,
-            'execution_time': time.time() - start_time,
-            'timestamp': time.time()
+            'execution_time': finished_at - start_time,
+            'timestamp': finished_at
         }
      
     async def _get_trends_source(
         self, 
         source_name: str, 
-        source: DataSource, 
         query: str
     ) -> TrendData:
         """
@@ -797,13 +874,14 @@ class MarketDataAggregator:
         
         Args:
             source_name: Name of the data source
-            source: DataSource instance
             query: Search query string
              
         Returns:
             TrendData object
         """
         try:
+            source = await self._aget_source(source_name)
+            
             # Run the trends search in a thread to avoid blocking the event loop
             loop = asyncio.get_running_loop()
             trend_data = await loop.run_in_executor(
@@ -829,10 +907,9 @@ class MarketDataAggregator:
         Clean up resources.
         """
         self.executor.shutdown(wait=True)
-        self.wildberries.close()
-        self.ozon.close()
-        self.yandex.close()
-        self.google_trends.close()
+        for source in self._sources.values():
+            source.close()
+        self._sources.clear()
      
     def __enter__(self):
         """
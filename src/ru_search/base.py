@@ -116,7 +116,8 @@ class DataSource(ABC):
         of requests.
         """
         with self._lock:
-            current_time = time.time()
+            # Monotonic clock: interval math must not jump with wall-clock changes
+            current_time = time.monotonic()
             
             # If this is the first request or enough time has passed, reset counter
             if self._last_request_time == 0 or (current_time - self._last_request_time) > 1.0:
@@ -130,7 +131,7 @@ class DataSource(ABC):
             if self._request_count > self.max_concurrent_requests:
                 time.sleep(1.0)  # Wait 1 second before allowing more requests
                 self._request_count = 0
-                self._last_request_time = time.time()
+                self._last_request_time = time.monotonic()
     
     def _normalize_response(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """
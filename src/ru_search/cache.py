@@ -5,11 +5,114 @@ This module implements a TTL-based caching system for search results,
 using in-memory dictionary storage with thread-safe operations.
 """
 
+import functools
+import heapq
+import itertools
+import pickle
 import threading
 import time
+import zlib
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
-import hashlib
+from typing import Dict, Any, Optional, List, Tuple, Callable
+
+import xxhash
+
+
+# Number of independently locked shards (must be a power of two)
+_SHARD_COUNT = 16
+_SHARD_MASK = _SHARD_COUNT - 1
+
+# Stale expiry-queue items tolerated per shard before the queue is rebuilt
+_EXPIRY_HEAP_SLACK = 64
+
+# Supported eviction policies
+_EVICTION_POLICIES = ('lru', 'lfu')
+
+# Longest ASCII query stored verbatim in a cache key instead of hashed
+_RAW_KEY_MAX_LENGTH = 64
+
+# zlib level for compressed values: favour speed over ratio
+_COMPRESSION_LEVEL = 1
+
+
+def _loads_compressed(blob: bytes) -> Any:
+    """
+    Rebuild a value stored as a zlib-compressed pickle.
+    
+    Args:
+        blob: Compressed pickle bytes
+    
+    Returns:
+        A fresh copy of the cached value
+    """
+    return pickle.loads(zlib.decompress(blob))
+
+
+@functools.lru_cache(maxsize=4096)
+def _cache_key(source: str, query: str) -> str:
+    """
+    Build the cache key for a source and query.
+    
+    Memoized so that repeated lookups of the same query skip hashing.
+    The source is only formatted into the key, never encoded or hashed,
+    so there is no per-source prefix worth precomputing.
+    
+    Short ASCII queries are used verbatim, prefixed with '=' (which never
+    appears in a hex digest) and with '%' and ':' percent-escaped so the
+    key stays unambiguous and keeps a single ':' separator.
+    
+    Args:
+        source: Data source name
+        query: Search query string
+    
+    Returns:
+        Cache key in format "source:query_hash" or "source:=query"
+    """
+    if len(query) <= _RAW_KEY_MAX_LENGTH and query.isascii():
+        if ':' in query or '%' in query:
+            query = query.replace('%', '%25').replace(':', '%3A')
+        return f"{source}:={query}"
+    
+    query_hash = xxhash.xxh3_128_hexdigest(query.encode('utf-8'))
+    return f"{source}:{query_hash}"
+
+
+class _CacheEntry:
+    """
+    A cached value with its metadata.
+    
+    Uses __slots__ instead of a per-entry dict, which keeps each entry
+    at a fraction of the memory of an equivalent four-key dict. When
+    loader is set, data holds the value serialized and loader rebuilds a
+    fresh copy of it; otherwise data is the value itself.
+    The entry with the lowest rank is evicted first: rank is the last-use
+    tick under the 'lru' policy and the hit count under 'lfu'.
+    """
+    
+    __slots__ = ('timestamp', 'data', 'source', 'loader', 'rank')
+    
+    def __init__(self, timestamp: float, data: Any, source: str,
+                 loader: Optional[Callable[[Any], Any]] = None):
+        self.timestamp = timestamp
+        self.data = data
+        self.source = source
+        self.loader = loader
+        self.rank = 0
+
+
+class _CacheShard:
+    """
+    A slice of the cache: its entries, the lock serializing writes to them
+    and an expiry queue of (expiration_time, key) items ordered by
+    expiration.
+    """
+    
+    __slots__ = ('entries', 'lock', 'expiry_heap')
+    
+    def __init__(self):
+        self.entries: Dict[str, _CacheEntry] = {}
+        self.lock = threading.Lock()
+        self.expiry_heap: List[Tuple[float, str]] = []
 
 
 class SearchCache:
@@ -18,33 +121,93 @@ class SearchCache:
     
     This class provides a thread-safe in-memory cache for storing and retrieving
     search results with automatic expiration based on time-to-live (TTL).
+    Entries are spread over shards with a lock each, so writes to
+    unrelated keys do not serialize on a single lock. Reads take no lock
+    at all: a dict lookup is atomic, and writers only ever insert, replace
+    or delete whole entries.
+    
+    The cache is bounded: each shard holds at most maxsize // 16 entries and
+    evicts its least recently used ('lru') or least frequently used ('lfu')
+    entry when it is full. The cache never grows past maxsize, but the bound
+    is approximate from below: keys are spread over the shards by their
+    string hash, which Python randomizes per process, so a shard can fill up
+    and start evicting while the cache as a whole holds fewer entries.
+    
+    Values are stored pickled and get() returns a fresh copy of them, so
+    a caller mutating a result cannot corrupt the cached entry. Unpicklable
+    values are stored as they are and shared. Pickles larger than
+    compress_threshold bytes are also zlib-compressed, trading some CPU on
+    get() for a much smaller footprint than a live object graph.
     """
     
-    def __init__(self, ttl: int = 21600):
+    def __init__(self, ttl: int = 21600, maxsize: int = 1024, policy: str = 'lru',
+                 time_func: Callable[[], float] = time.monotonic,
+                 compress_threshold: Optional[int] = 4096):
         """
         Initialize the SearchCache with a specified TTL.
         
         Args:
             ttl: Time-to-live in seconds (default: 21600 = 6 hours)
+            maxsize: Maximum number of entries, at least one per shard
+                (default: 1024)
+            policy: Eviction policy, 'lru' or 'lfu' (default: 'lru')
+            time_func: Clock returning the current time in seconds, used for
+                entry timestamps and expiration (default: time.monotonic)
+            compress_threshold: Pickled size in bytes above which values are
+                also compressed, or None to never compress (default: 4096)
+            
+        Raises:
+            ValueError: If maxsize is below the shard count or policy is unknown
         """
+        if maxsize < _SHARD_COUNT:
+            raise ValueError(f"maxsize must be at least {_SHARD_COUNT}, got {maxsize}")
+        if policy not in _EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{policy}', expected one of {_EVICTION_POLICIES}")
+        
         self.ttl = ttl
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._lock = threading.Lock()
+        self.maxsize = maxsize
+        self.policy = policy
+        self._now = time_func
+        self._tick = itertools.count(1).__next__  # Logical clock for LRU ranks
+        self.compress_threshold = compress_threshold
+        self._shard_maxsize = maxsize // _SHARD_COUNT
+        self._shards: List[_CacheShard] = [_CacheShard() for _ in range(_SHARD_COUNT)]
+    
+    def __len__(self) -> int:
+        """
+        Return the number of entries in the cache, including expired ones
+        that have not been removed yet.
+        """
+        return sum(len(shard.entries) for shard in self._shards)
+    
+    def _shard(self, key: str) -> _CacheShard:
+        """
+        Get the shard responsible for a cache key.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Shard holding the key
+        """
+        return self._shards[hash(key) & _SHARD_MASK]
     
     def _make_key(self, source: str, query: str) -> str:
         """
-        Create a cache key from source and query using MD5 hashing.
+        Create a cache key from source and query using xxHash (XXH3-128).
+        
+        The hash only needs to be fast and well distributed, not
+        cryptographically secure, so a non-cryptographic hash is used.
+        Short ASCII queries skip hashing and are embedded in the key.
         
         Args:
             source: Data source name
             query: Search query string
-            
+        
         Returns:
-            Cache key in format "source:query_hash"
+            Cache key in format "source:query_hash" or "source:=query"
         """
-        # Create MD5 hash of the query
-        query_hash = hashlib.md5(query.encode('utf-8')).hexdigest()
-        return f"{source}:{query_hash}"
+        return _cache_key(source, query)
     
     def get(self, source: str, query: str) -> Optional[Dict[str, Any]]:
         """
@@ -53,33 +216,36 @@ class SearchCache:
         Args:
             source: Data source name
             query: Search query string
-            
+        
         Returns:
             Cached data if available and not expired, None otherwise
         """
         key = self._make_key(source, query)
+        shard = self._shards[hash(key) & _SHARD_MASK]
         
-        with self._lock:
-            cached_item = self._cache.get(key)
-            if cached_item is None:
-                return None
-            
-            # Check if the cached item has expired
-            cache_time = cached_item.get('timestamp')
-            if cache_time is None:
-                return None
-                
-            # Calculate expiration time
-            expiration_time = cache_time + self.ttl
-            current_time = time.time()
-            
-            # Remove expired item and return None
-            if current_time > expiration_time:
-                del self._cache[key]
-                return None
-            
-            # Return cached data
-            return cached_item.get('data')
+        cached_item = shard.entries.get(key)
+        if cached_item is None:
+            return None
+        
+        # Remove expired item and return None
+        if self._now() > cached_item.timestamp + self.ttl:
+            with shard.lock:
+                # Leave it alone if a writer replaced it in the meantime
+                if shard.entries.get(key) is cached_item:
+                    del shard.entries[key]
+            return None
+        
+        # Record the hit for the eviction policy; a racing reader can lose
+        # an update, which only makes eviction slightly less precise
+        if self.policy == 'lru':
+            cached_item.rank = self._tick()
+        else:
+            cached_item.rank += 1
+        
+        loader = cached_item.loader
+        if loader is None:
+            return cached_item.data
+        return loader(cached_item.data)
     
     def set(self, source: str, query: str, data: Dict[str, Any]) -> None:
         """
@@ -91,41 +257,120 @@ class SearchCache:
             data: Data to cache
         """
         key = self._make_key(source, query)
+        packed, loader = self._pack(data)
+        self._store(key, _CacheEntry(self._now(), packed, source, loader))
+    
+    def _pack(self, data: Any) -> Tuple[Any, Optional[Callable[[Any], Any]]]:
+        """
+        Serialize a value for storage, compressing it if its pickled form
+        exceeds the compression threshold.
+        
+        Args:
+            data: Data to cache
+        
+        Returns:
+            Tuple of the value to store and the function rebuilding it,
+            or None if the value is stored as it is
+        """
+        try:
+            blob = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # Values that cannot be pickled are cached as they are
+            return data, None
+        
+        if self.compress_threshold is not None and len(blob) > self.compress_threshold:
+            return zlib.compress(blob, _COMPRESSION_LEVEL), _loads_compressed
+        return blob, pickle.loads
+    
+    def _store(self, key: str, cache_item: _CacheEntry) -> None:
+        """
+        Store a cache item, queue it for expiration and evict entries
+        if the shard is over capacity.
+        
+        Args:
+            key: Cache key
+            cache_item: Cache entry to store
+        """
+        shard = self._shards[hash(key) & _SHARD_MASK]
+        
+        if self.policy == 'lru':
+            cache_item.rank = self._tick()
+        
+        with shard.lock:
+            entries = shard.entries
+            if key not in entries:
+                # Make room before inserting so a new entry is never
+                # its own eviction victim
+                while len(entries) >= self._shard_maxsize:
+                    self._evict(shard)
+            entries[key] = cache_item
+            
+            heapq.heappush(shard.expiry_heap, (cache_item.timestamp + self.ttl, key))
+            
+            # Overwritten keys leave stale queue items behind; once they
+            # pile up, drop expired entries and rebuild the queue
+            if len(shard.expiry_heap) > 2 * len(shard.entries) + _EXPIRY_HEAP_SLACK:
+                self._purge_expired(shard, self._now())
+                shard.expiry_heap = [
+                    (item.timestamp + self.ttl, item_key)
+                    for item_key, item in shard.entries.items()
+                ]
+                heapq.heapify(shard.expiry_heap)
+    
+    def _evict(self, shard: _CacheShard) -> None:
+        """
+        Evict one entry from a shard according to the eviction policy.
         
-        cache_item = {
-            'timestamp': time.time(),
-            'data': data,
-            'source': source,
-            'query_hash': key.split(':')[1]  # Store the hash part
-        }
+        The caller must hold the shard lock. Its expiry queue item is left
+        behind and skipped when popped.
         
-        with self._lock:
-            self._cache[key] = cache_item
+        Args:
+            shard: Shard to evict from
+        """
+        entries = shard.entries
+        # Lowest rank wins; ties go to the earliest inserted entry. Shards
+        # hold at most maxsize // _SHARD_COUNT entries, so the scan is short
+        victim = min(entries, key=lambda key: entries[key].rank)
+        del entries[victim]
+    
+    def _purge_expired(self, shard: _CacheShard, current_time: float) -> None:
+        """
+        Pop expired items off a shard's expiry queue and delete their entries.
+        
+        The caller must hold the shard lock. Queue items left behind by
+        overwrites are skipped: the live entry has a later expiration time.
+        
+        Args:
+            shard: Shard to purge
+            current_time: Current time in seconds, as returned by the cache clock
+        """
+        heap = shard.expiry_heap
+        while heap and current_time > heap[0][0]:
+            _, key = heapq.heappop(heap)
+            cached_item = shard.entries.get(key)
+            if cached_item is not None and current_time > cached_item.timestamp + self.ttl:
+                del shard.entries[key]
     
     def clear(self) -> None:
         """
         Clear all cache entries.
         """
-        with self._lock:
-            self._cache.clear()
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.expiry_heap.clear()
     
     def _cleanup_expired(self) -> None:
         """
         Remove all expired cache entries.
         
         This method is called internally to clean up expired items.
+        Shards are swept one at a time, and each sweep only pops the
+        expired head of the shard's expiry queue, so its cost depends on
+        the number of expired items rather than the size of the cache.
         """
-        current_time = time.time()
-        expired_keys = []
+        current_time = self._now()
         
-        with self._lock:
-            for key, cached_item in self._cache.items():
-                cache_time = cached_item.get('timestamp')
-                if cache_time is not None:
-                    expiration_time = cache_time + self.ttl
-                    if current_time > expiration_time:
-                        expired_keys.append(key)
-            
-            # Remove expired items
-            for key in expired_keys:
-                del self._cache[key]
\ No newline at end of file
+        for shard in self._shards:
+            with shard.lock:
+                self._purge_expired(shard, current_time)
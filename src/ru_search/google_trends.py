@@ -6,10 +6,12 @@ using the pytrends library. It provides trend analysis for the Russian market wi
 rate limiting, error handling, and caching support.
 """
 
+import functools
 import time
 import threading
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import weakref
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from datetime import datetime, timedelta
 import json
 
@@ -20,6 +22,68 @@ from .base import DataSource, Product, TrendData
 from .cache import SearchCache
 
 
+@functools.lru_cache(maxsize=4096)
+def _trends_cache_key(query: str, method: str) -> str:
+    """
+    Build the cache key for trends data.
+    
+    Memoized so that repeated lookups return the same key object, whose
+    hash is already computed when the cache hashes it again.
+    
+    Args:
+        query: Search query string
+        method: Method name (interest_over_time, related_queries)
+        
+    Returns:
+        Cache key string
+    """
+    return f"google_trends:{method}:{query}"
+
+
+# pytrends clients shared by all GoogleTrendsAPI instances, by thread and then
+# by (hl, tz, timeout). Keyed by the thread object rather than its id, which
+# the OS reuses, so a thread's clients are dropped once it is gone
+_trends_client_pool: 'weakref.WeakKeyDictionary[threading.Thread, Dict[Tuple, TrendReq]]' = weakref.WeakKeyDictionary()
+_trends_client_pool_lock = threading.Lock()
+
+
+def _pooled_trends_client(hl: str, tz: int, timeout: Tuple[int, int]) -> TrendReq:
+    """
+    Get the calling thread's pytrends client shared by all GoogleTrendsAPI instances.
+    
+    Building a TrendReq sets up an HTTP session and fetches Google cookies,
+    so clients are pooled instead of rebuilt for every instance. The pool
+    is per thread, since a client wraps a requests.Session and must not be
+    used by two threads at once. Failed constructions raise and are not
+    pooled.
+    
+    Args:
+        hl: Interface language
+        tz: Timezone offset in minutes
+        timeout: Connect and read timeout
+        
+    Returns:
+        TrendReq client configured for the given settings
+    """
+    thread = threading.current_thread()
+    settings = (hl, tz, timeout)
+    with _trends_client_pool_lock:
+        client = _trends_client_pool.get(thread, {}).get(settings)
+    
+    if client is None:
+        # Only this thread creates clients for itself, so no other can race it here
+        client = TrendReq(
+            hl=hl,
+            tz=tz,
+            timeout=timeout,
+            retries=2,
+            backoff_factor=0.5
+        )
+        with _trends_client_pool_lock:
+            _trends_client_pool.setdefault(thread, {})[settings] = client
+    return client
+
+
 class GoogleTrendsAPI(DataSource):
     """
     Google Trends API implementation for market trend analysis.
@@ -32,12 +96,20 @@ class GoogleTrendsAPI(DataSource):
     - Comprehensive error handling and logging
     """
     
-    def __init__(self, api_key: Optional[str] = None, **kwargs):
+    def __init__(self, api_key: Optional[str] = None,
+                 trends_client: Optional[Any] = None,
+                 time_func: Callable[[], float] = time.monotonic,
+                 sleep_func: Callable[[float], None] = time.sleep,
+                 **kwargs):
         """
         Initialize the Google Trends API.
         
         Args:
             api_key: Optional API key (not used for Google Trends, but kept for interface compatibility)
+            trends_client: Optional pre-built client exposing the pytrends TrendReq interface
+                (build_payload, interest_over_time, related_queries); a TrendReq is created if omitted
+            time_func: Clock returning the current time in seconds, used for rate limiting (default: time.monotonic)
+            sleep_func: Function used to wait when rate limited (default: time.sleep)
             **kwargs: Additional configuration parameters
         """
         # Configure logging first
@@ -57,36 +129,68 @@ class GoogleTrendsAPI(DataSource):
         self.max_concurrent_requests = 1  # Google Trends doesn't like parallel requests
         self.request_interval = 5  # Minimum 5 seconds between requests
         
-        # Initialize pytrends client
-        self._init_trends_client()
+        # pytrends clients wrap a requests.Session, so each thread gets its
+        # own from the pool; a supplied client is shared by all threads instead
+        self._thread_local = threading.local()
+        self._shared_trends_client = trends_client
+        if trends_client is None:
+            self._init_trends_client()
         
-        # Rate limiting tracking
-        self._last_request_time = 0
+        # Rate limiting tracking, shared by all threads
+        self._now = time_func
+        self._sleep = sleep_func
+        self._next_request_time = 0.0  # Earliest time the next request may start
         self._hourly_request_count = 0
-        self._hourly_lock = threading.Lock()
+        self._rate_limit_lock = threading.Lock()
         self._last_hour = 0
         
         # Initialize cache for trends data
         self.cache = SearchCache(ttl=3600)  # 1 hour cache for trends data
         
+        # Cache misses currently being fetched, by cache key
+        self._inflight: Dict[str, threading.Event] = {}
+        self._inflight_lock = threading.Lock()
+        
         # Override base rate limiting settings
         self.max_concurrent_requests = 1
         self.request_timeout = 30
         self.max_retries = 3
 
+    @property
+    def trends_client(self) -> Any:
+        """
+        Get the pytrends client for the calling thread.
+        
+        Returns:
+            The supplied client if one was given, otherwise this thread's
+            pooled TrendReq, fetched on first use
+        """
+        if self._shared_trends_client is not None:
+            return self._shared_trends_client
+        
+        client = getattr(self._thread_local, 'client', None)
+        if client is None:
+            self._init_trends_client()
+            client = self._thread_local.client
+        return client
+    
+    @trends_client.setter
+    def trends_client(self, client: Any) -> None:
+        """
+        Replace the pytrends client with one shared by all threads.
+        
+        Args:
+            client: Client exposing the pytrends TrendReq interface
+        """
+        self._shared_trends_client = client
+
     def _init_trends_client(self) -> None:
         """
-        Initialize the pytrends client with Russian market settings.
+        Initialize the calling thread's pytrends client with Russian market settings.
         """
         try:
             # Initialize with Russian language and timezone settings
-            self.trends_client = TrendReq(
-                hl=self.hl,
-                tz=self.tz,
-                timeout=self.timeout,
-                retries=2,
-                backoff_factor=0.5
-            )
+            self._thread_local.client = _pooled_trends_client(self.hl, self.tz, self.timeout)
             self.logger.info("Google Trends client initialized successfully")
         except Exception as e:
             self.logger.error(f"Failed to initialize Google Trends client: {str(e)}")
@@ -99,37 +203,42 @@ class GoogleTrendsAPI(DataSource):
         Ensures:
         - Minimum 5 seconds between requests
         - Maximum 100 requests per hour (conservative estimate)
-        """
-        current_time = time.time()
         
-        # Check minimum interval between requests
-        time_since_last = current_time - self._last_request_time
-        if time_since_last < self.request_interval:
-            sleep_time = self.request_interval - time_since_last
-            self.logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
-        
-        # Check hourly request limit
-        with self._hourly_lock:
-            current_hour = int(current_time // 3600)  # Current hour in Unix timestamp
+        Each request sets the earliest time the next one may start, so a
+        call only sleeps for the part of the interval that has not already
+        passed. Callers from different threads are serialized, since
+        Google Trends does not tolerate parallel requests.
+        """
+        with self._rate_limit_lock:
+            current_time = self._now()
+            
+            # Wait out the remainder of the minimum interval, if any
+            sleep_time = self._next_request_time - current_time
+            if sleep_time > 0:
+                self.logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
+                self._sleep(sleep_time)
+                current_time = self._now()
+            
+            # Check hourly request limit
+            current_hour = int(current_time // 3600)  # Current hour-long quota window
             if current_hour != self._last_hour:
                 # New hour, reset counter
                 self._hourly_request_count = 0
                 self._last_hour = current_hour
             
             if self._hourly_request_count >= self.max_requests_per_hour:
-                # Wait until next hour
+                # Wait until the next quota window
                 seconds_until_next_hour = 3600 - (current_time % 3600)
                 self.logger.warning(f"Hourly quota reached, waiting {seconds_until_next_hour:.2f} seconds")
-                time.sleep(seconds_until_next_hour)
+                self._sleep(seconds_until_next_hour)
                 # Reset counter for new hour
                 self._hourly_request_count = 0
-                self._last_hour = int(time.time() // 3600)
+                self._last_hour = int(self._now() // 3600)
             
             self._hourly_request_count += 1
-        
-        # Update last request timestamp
-        self._last_request_time = time.time()
+            
+            # Schedule the earliest start of the next request
+            self._next_request_time = self._now() + self.request_interval
 
     def _make_cache_key(self, query: str, method: str) -> str:
         """
@@ -142,7 +251,7 @@ class GoogleTrendsAPI(DataSource):
         Returns:
             Cache key string
         """
-        return f"google_trends:{method}:{query}"
+        return _trends_cache_key(query, method)
 
     def _get_cached_data(self, query: str, method: str) -> Optional[Dict[str, Any]]:
         """
@@ -194,15 +303,21 @@ class GoogleTrendsAPI(DataSource):
         self._google_trends_rate_limit()
         
         # Try to get cached data first
+        flight = None
         if use_cache:
-            cached_data = self._get_cached_data(query, 'interest_over_time')
-            if cached_data is not None:
-                self.logger.info(f"Cache hit for interest_over_time: {query}")
-                return TrendData(
-                    query=cached_data['query'],
-                    trend_score=cached_data['trend_score'],
-                    historical_data=cached_data['historical_data']
-                )
+            cached_trend = self._get_cached_interest(query)
+            if cached_trend is not None:
+                return cached_trend
+            
+            # Only one thread fetches a given query; the others wait for its result
+            flight, is_owner = self._join_flight(query, 'interest_over_time')
+            if not is_owner:
+                flight.wait()
+                flight = None
+                cached_trend = self._get_cached_interest(query)
+                if cached_trend is not None:
+                    return cached_trend
+                # The fetching thread failed, so fetch independently
         
         try:
             # Build payload for Google Trends
@@ -237,6 +352,65 @@ class GoogleTrendsAPI(DataSource):
                 trend_score=0.5,  # Neutral score
                 historical_data=[]  # No historical data
             )
+        
+        finally:
+            if flight is not None:
+                self._end_flight(query, 'interest_over_time', flight)
+
+    def _get_cached_interest(self, query: str) -> Optional[TrendData]:
+        """
+        Get cached interest over time data as TrendData.
+        
+        Args:
+            query: Search query string
+            
+        Returns:
+            TrendData if cached, None otherwise
+        """
+        cached_data = self._get_cached_data(query, 'interest_over_time')
+        if cached_data is None:
+            return None
+        
+        self.logger.info(f"Cache hit for interest_over_time: {query}")
+        return TrendData(
+            query=cached_data['query'],
+            trend_score=cached_data['trend_score'],
+            historical_data=cached_data['historical_data']
+        )
+
+    def _join_flight(self, query: str, method: str) -> Tuple[threading.Event, bool]:
+        """
+        Join the in-flight fetch for a query, starting one if there is none.
+        
+        Args:
+            query: Search query string
+            method: Method name
+            
+        Returns:
+            Tuple of the event set when the fetch finishes and whether the
+            caller owns the fetch (and must end it with _end_flight)
+        """
+        cache_key = self._make_cache_key(query, method)
+        with self._inflight_lock:
+            flight = self._inflight.get(cache_key)
+            if flight is not None:
+                return flight, False
+            flight = self._inflight[cache_key] = threading.Event()
+            return flight, True
+
+    def _end_flight(self, query: str, method: str, flight: threading.Event) -> None:
+        """
+        Finish an owned in-flight fetch and wake up the waiting threads.
+        
+        Args:
+            query: Search query string
+            method: Method name
+            flight: Event returned by _join_flight
+        """
+        cache_key = self._make_cache_key(query, method)
+        with self._inflight_lock:
+            del self._inflight[cache_key]
+        flight.set()
 
     def _process_interest_data(self, interest_df: pd.DataFrame, query: str) -> TrendData:
         """
@@ -250,36 +424,31 @@ class GoogleTrendsAPI(DataSource):
             TrendData object with processed data
         """
         try:
-            # Reset index to get date as column
-            interest_df = interest_df.reset_index()
+            # Drop missing data points; the series stays indexed by date
+            interest_values = interest_df[query].dropna()
+            values = interest_values.to_numpy(dtype=float)
             
             # Calculate overall trend score (average of all data points, normalized to 0-1)
-            interest_values = interest_df[query].dropna()
-            if len(interest_values) == 0:
+            if len(values) == 0:
                 trend_score = 0.5  # Neutral score if no data
             else:
                 # Normalize to 0-1 range based on max value in the series
-                max_value = interest_values.max()
+                max_value = values.max()
                 if max_value > 0:
-                    trend_score = min(interest_values.mean() / max_value, 1.0)
+                    trend_score = min(values.mean() / max_value, 1.0)
                 else:
                     trend_score = 0.0
             
-            # Convert to historical data format
-            historical_data = []
-            for _, row in interest_df.iterrows():
-                date_str = row['date'].strftime('%Y-%m-%d')
-                interest_value = row[query]
-                
-                # Handle NaN values
-                if pd.isna(interest_value):
-                    continue
-                    
-                historical_data.append({
+            # Convert to historical data format, formatting all dates at once
+            dates = pd.DatetimeIndex(interest_values.index).strftime('%Y-%m-%d')
+            historical_data = [
+                {
                     'date': date_str,
                     'search_volume': int(interest_value),
-                    'trend_index': float(interest_value) / 100.0  # Normalize to 0-1 range
-                })
+                    'trend_index': interest_value / 100.0  # Normalize to 0-1 range
+                }
+                for date_str, interest_value in zip(dates, values.tolist())
+            ]
             
             return TrendData(
                 query=query,
@@ -475,7 +644,8 @@ class GoogleTrendsAPI(DataSource):
         Clean up resources.
         """
         super().close()
-        # No specific cleanup needed for pytrends
+        # pytrends clients are pooled and shared with other instances,
+        # so they are left open
 
     def __enter__(self):
         """
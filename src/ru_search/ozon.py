@@ -20,6 +20,45 @@ from requests.exceptions import RequestException
 from .base import DataSource, Product
 
 
+# Headers sent with every Ozon request, apart from the rotated User-Agent
+_BASE_HEADERS = {
+    'Accept': 'application/json',
+    'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Referer': 'https://www.ozon.ru/',
+    'Origin': 'https://www.ozon.ru'
+}
+
+# Attribute identifying the script tag that embeds the page data as JSON
+_NEXT_DATA_ID = 'id="__NEXT_DATA__"'
+
+
+def _extract_next_data(html: str) -> Optional[str]:
+    """
+    Extract the JSON text of the __NEXT_DATA__ script tag from a page.
+    
+    The tag is located with plain string searches, which avoids building
+    a parse tree of the whole page. Markup the searches do not recognise
+    is handed to BeautifulSoup instead.
+    
+    Args:
+        html: Search page HTML
+        
+    Returns:
+        The script tag contents, or None if the page has no such tag
+    """
+    id_position = html.find(_NEXT_DATA_ID)
+    if id_position != -1:
+        tag_start = html.rfind('<', 0, id_position)
+        content_start = html.find('>', id_position) + 1
+        content_end = html.find('</script>', content_start)
+        if html.startswith('<script', tag_start) and content_start and content_end != -1:
+            return html[content_start:content_end]
+    
+    soup = BeautifulSoup(html, 'html.parser')
+    next_data_script = soup.find('script', {'id': '__NEXT_DATA__'})
+    return next_data_script.string if next_data_script else None
+
+
 class OzonSearch(DataSource):
     """
     Ozon data source implementation.
@@ -50,6 +89,10 @@ class OzonSearch(DataSource):
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0",
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15"
         ]
+        # Complete header sets, one per User-Agent, copied for each request
+        self._header_variants = tuple(
+            {'User-Agent': user_agent, **_BASE_HEADERS} for user_agent in self.user_agents
+        )
         
         # Rate limiting for Ozon
         # Max 1 request per 2 seconds, max 30 requests per minute
@@ -107,16 +150,14 @@ class OzonSearch(DataSource):
         """
         Get headers for Ozon requests.
         
+        The header sets are built once per User-Agent, so each call only
+        picks one and copies it. A copy is returned every time, since
+        request code adds headers to it.
+        
         Returns:
             Dictionary of HTTP headers with User-Agent rotation
         """
-        return {
-            'User-Agent': random.choice(self.user_agents),
-            'Accept': 'application/json',
-            'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Referer': 'https://www.ozon.ru/',
-            'Origin': 'https://www.ozon.ru'
-        }
+        return random.choice(self._header_variants).copy()
     
     def _try_api_search(self, query: str) -> Optional[List[Product]]:
         """
@@ -230,17 +271,14 @@ class OzonSearch(DataSource):
             # Check for successful response
             response.raise_for_status()
             
-            # Parse HTML to extract JSON data
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
             # Look for the NEXT_DATA script tag
-            next_data_script = soup.find('script', {'id': '__NEXT_DATA__'})
+            next_data = _extract_next_data(response.text)
             
-            if not next_data_script:
+            if not next_data:
                 raise Exception("Could not find __NEXT_DATA__ script tag")
             
             # Extract and parse JSON data
-            json_data = json.loads(next_data_script.string)
+            json_data = json.loads(next_data)
             
             # Extract products from the JSON structure
             products = []
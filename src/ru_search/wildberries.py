@@ -5,20 +5,87 @@ This module implements a client for Wildberries public search API that collects
 product listings, prices, ratings, reviews count, sales count, brand, and product URLs.
 """
 
+import asyncio
 import time
 import random
 import threading
 import logging
-from typing import List, Dict, Any, Optional
-from urllib.parse import quote
+from operator import itemgetter
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+from urllib.parse import quote, urlencode
+
+import aiohttp
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException, RetryError
+from urllib3.util import Retry
 
 from .base import DataSource, Product
+from .cache import SearchCache
 
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Product record fields read by _parse_product_data, with the values assumed
+# when a record lacks them
+_PRODUCT_DEFAULTS = {
+    'id': '',
+    'name': '',
+    'salePriceU': 0,
+    'priceU': 0,
+    'rating': 0,
+    'feedback': 0,
+    'brand': '',
+    'volume': 0,
+    'selling': False,
+    'new': False,
+    'sale': False,
+}
+
+# Reads all of them in a single call
+_get_product_fields = itemgetter(*_PRODUCT_DEFAULTS)
+
+# Statuses Wildberries answers with when it throttles (429) or blocks (403) a client
+_RATE_LIMIT_STATUSES = frozenset({403, 429})
+
+# Response statuses worth retrying: rate limiting and transient server errors
+_RETRY_STATUSES = _RATE_LIMIT_STATUSES | {500, 502, 503, 504}
+
+
+def _retry_backoff(status: Optional[int], attempt: int) -> float:
+    """
+    Get the backoff before retrying a failed request.
+    
+    Used by both the synchronous and the asynchronous request paths.
+    
+    Args:
+        status: Response status of the failed attempt, or None if no
+            response was received
+        attempt: Zero-based number of the failed attempt
+        
+    Returns:
+        Seconds to wait before the next attempt
+    """
+    if status in _RATE_LIMIT_STATUSES:
+        # Exponential backoff specifically for rate limiting/forbidden errors
+        return min(60, (2 ** attempt) * 5)  # Max 60 seconds
+    return (2 ** attempt) * 0.1
+
+
+class _RateLimitRetry(Retry):
+    """
+    urllib3 retry policy waiting _retry_backoff between attempts, unless
+    the server asks for a delay with a Retry-After header.
+    """
+    
+    def get_backoff_time(self) -> float:
+        if not self.history:
+            return 0
+        return _retry_backoff(self.history[-1].status, len(self.history) - 1)
+
 
 class WildberriesPublicAPI(DataSource):
     """
@@ -28,12 +95,20 @@ class WildberriesPublicAPI(DataSource):
     rate limiting, error handling, and data normalization.
     """
     
-    def __init__(self, api_key: Optional[str] = None, **kwargs):
+    def __init__(self, api_key: Optional[str] = None,
+                 response_cache_ttl: Optional[int] = None,
+                 async_sleep_func: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+                 **kwargs):
         """
         Initialize the Wildberries data source.
         
         Args:
             api_key: Optional API key for authentication
+            response_cache_ttl: Seconds to reuse successful GET responses for,
+                or None to always request fresh data (default: None)
+            async_sleep_func: Coroutine function used by asynchronous searches
+                to wait for the rate limiter and between retries
+                (default: asyncio.sleep)
             **kwargs: Additional configuration parameters
         """
         super().__init__("wildberries", api_key, **kwargs)
@@ -42,32 +117,112 @@ class WildberriesPublicAPI(DataSource):
         self.base_url = "https://search.wb.ru/exactmatch/ru/common/v4/search"
         self.user_agent = "idea-planner-agent/0.1.0"
         
-        # Rate limiting for Wildberries API - 1 request per second
-        self._last_request_time = 0
+        # Rate limiting for Wildberries API - 1 request per second, as a
+        # token bucket refilled at _rate tokens per second
+        self._rate = 1.0
+        self._capacity = 1.0  # No bursts above the API limit
+        self._tokens = self._capacity
+        self._last_refill = time.monotonic()
         self._lock = threading.Lock()
+        self._async_sleep = async_sleep_func
         
         # Override base rate limiting settings for Wildberries
         self.max_concurrent_requests = 1  # Strict rate limiting
         self.request_timeout = 30  # Wildberries can be slow
         self.max_retries = 5  # More retries for rate limiting
+        
+        # Retries and backoff, honouring Retry-After, happen in urllib3 below
+        # the session; exhausting them raises requests' RetryError
+        self.session = requests.Session()
+        self._adapter = HTTPAdapter(
+            max_retries=self._retry_policy(),
+            pool_connections=20,
+            pool_maxsize=20
+        )
+        self.session.mount('https://', self._adapter)
+        
+        # Successful GET responses can be reused for a short while, so repeated
+        # queries skip both the network and the rate limiter. Off by default:
+        # callers asking for fresh data, like MarketDataAggregator.search()
+        # with use_cache=False, must reach the API
+        self.response_cache_ttl = response_cache_ttl
+        self._response_cache = (
+            SearchCache(ttl=response_cache_ttl, maxsize=256) if response_cache_ttl else None
+        )
+        
+        # Connections kept open by asearch_many; requests still start at most
+        # once per second because of the rate limiter
+        self.max_connections = 30
 
     def _rate_limit(self) -> None:
         """
         Implement Wildberries-specific rate limiting.
         
-        Ensures maximum 1 request per second as required by the API.
+        Ensures maximum 1 request per second as required by the API by
+        sleeping until the token reserved for the request arrives.
+        """
+        sleep_time = self._reserve_token()
+        if sleep_time > 0:
+            logger.debug(f"Rate limiting: sleeping for {sleep_time:.3f} seconds")
+            time.sleep(sleep_time)
+
+    async def _arate_limit(self) -> None:
+        """
+        Asynchronous counterpart of _rate_limit, waiting on the event loop
+        rather than in a thread.
         """
-        current_time = time.time()
+        sleep_time = self._reserve_token()
+        if sleep_time > 0:
+            logger.debug(f"Rate limiting: sleeping for {sleep_time:.3f} seconds")
+            await self._async_sleep(sleep_time)
+
+    def _reserve_token(self) -> float:
+        """
+        Take a token for a request from the rate limiter's bucket.
+        
+        The bucket holds up to _capacity tokens and is refilled at _rate
+        tokens per second. Taking a token from an empty bucket reserves the
+        next one to arrive, so callers are spaced out without anyone
+        waiting while holding the lock.
         
+        Returns:
+            Seconds to wait before sending the request
+        """
         with self._lock:
-            time_since_last = current_time - self._last_request_time
-            if time_since_last < 1.0:
-                sleep_time = 1.0 - time_since_last
-                logger.debug(f"Rate limiting: sleeping for {sleep_time:.3f} seconds")
-                time.sleep(sleep_time)
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._last_refill) * self._rate)
+            self._last_refill = now
             
-            # Update last request timestamp
-            self._last_request_time = time.time()
+            # A negative balance counts the tokens already reserved
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self._rate)
+
+    @property
+    def max_retries(self) -> int:
+        """Maximum number of attempts per request, the first one included."""
+        return self._max_retries
+
+    @max_retries.setter
+    def max_retries(self, value: int) -> None:
+        self._max_retries = value
+        # The base class sets max_retries before the session's adapter exists
+        adapter = getattr(self, '_adapter', None)
+        if adapter is not None:
+            adapter.max_retries = self._retry_policy()
+
+    def _retry_policy(self) -> Retry:
+        """
+        Build the session's retry policy from the current max_retries.
+        
+        Returns:
+            Retry allowing max_retries attempts in total, like _amake_request
+        """
+        return _RateLimitRetry(
+            total=max(self.max_retries - 1, 0),
+            status_forcelist=_RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'POST']),
+            respect_retry_after_header=True
+        )
 
     def _get_headers(self) -> Dict[str, str]:
         """
@@ -95,42 +250,31 @@ class WildberriesPublicAPI(DataSource):
             Product object with extracted information
         """
         try:
-            # Extract basic product information
-            product_id = str(product_data.get('id', ''))
-            title = product_data.get('name', '').strip()
-            
-            # Extract price information (convert from kopecks to rubles)
-            price = product_data.get('salePriceU', 0) / 100
-            old_price = product_data.get('priceU', 0) / 100
-            
-            # Extract rating and reviews
-            rating = product_data.get('rating', 0)
-            reviews_count = product_data.get('feedback', 0)
-            
-            # Extract brand information
-            brand = product_data.get('brand', '').strip()
-            
-            # Construct product URL
-            product_url = f"https://www.wildberries.ru/catalog/{product_id}/detail.aspx"
+            try:
+                fields = _get_product_fields(product_data)
+            except KeyError:
+                # Rare: fill in defaults for the missing fields
+                fields = _get_product_fields({**_PRODUCT_DEFAULTS, **product_data})
+            (product_id, name, sale_price, old_price, rating, reviews_count,
+             brand, volume, is_available, is_new, is_sale) = fields
             
-            # Extract additional metadata
-            metadata = {
-                'old_price': old_price,
-                'rating': rating,
-                'reviews_count': reviews_count,
-                'brand': brand,
-                'sales_count': product_data.get('volume', 0),  # Sales volume
-                'is_available': product_data.get('selling', False),
-                'is_new': product_data.get('new', False),
-                'is_sale': product_data.get('sale', False)
-            }
+            product_id = str(product_id)
             
+            # Metadata is passed as keywords directly rather than built into
+            # a dict first, since Product collects it into one anyway
             return Product(
                 id=product_id,
-                title=title,
-                price=price,
-                url=product_url,
-                **metadata
+                title=name.strip(),
+                price=sale_price / 100,  # Kopecks to rubles
+                url=f"https://www.wildberries.ru/catalog/{product_id}/detail.aspx",
+                old_price=old_price / 100,
+                rating=rating,
+                reviews_count=reviews_count,
+                brand=brand.strip(),
+                sales_count=volume,  # Sales volume
+                is_available=is_available,
+                is_new=is_new,
+                is_sale=is_sale
             )
         except Exception as e:
             logger.error(f"Failed to parse product data: {e}")
@@ -149,46 +293,131 @@ class WildberriesPublicAPI(DataSource):
         Raises:
             Exception: If search fails after maximum retries
         """
-        # Prepare search parameters
-        params = {
-            'query': query,
-            'resultset': 'catalog',
-            'limit': 100,
-            'sort': 'popular',  # Sort by popularity
-            'currency': 'RUB',
-            'dest': '-1216603',  # Moscow region by default
-            'spp': 0  # Don't filter by price
-        }
-        
         try:
             # Make the API request
             response_data = self._make_request(
                 url=self.base_url,
                 method='GET',
-                params=params,
+                params=self._search_params(query),
                 headers=self._get_headers()
             )
+            return self._parse_search_response(response_data, query)
             
-            # Extract products from response
-            products = []
-            raw_products = response_data.get('data', {}).get('products', [])
+        except Exception as e:
+            logger.error(f"Wildberries search failed: {e}")
+            raise Exception(f"Wildberries search failed: {str(e)}")
+
+    async def asearch(self, query: str,
+                      session: Optional[aiohttp.ClientSession] = None) -> List[Product]:
+        """
+        Search for products on Wildberries without blocking the event loop.
+        
+        Args:
+            query: Search query string
+            session: Optional aiohttp session to reuse; a session of its own
+                is opened and closed otherwise
             
-            for product_data in raw_products:
-                try:
-                    product = self._parse_product_data(product_data)
-                    products.append(product)
-                except (KeyError, TypeError, ValueError) as e:
-                    # Skip malformed product entries
-                    logger.warning(f"Skipping malformed product: {e}")
-                    continue
+        Returns:
+            List of Product objects matching the search query
             
-            logger.info(f"Found {len(products)} products for query: '{query}'")
-            return products
+        Raises:
+            Exception: If search fails after maximum retries
+        """
+        if session is None:
+            async with self._open_session() as own_session:
+                return await self.asearch(query, own_session)
+        
+        try:
+            response_data = await self._amake_request(
+                session,
+                url=self.base_url,
+                params=self._search_params(query),
+                headers=self._get_headers()
+            )
+            return self._parse_search_response(response_data, query)
             
         except Exception as e:
             logger.error(f"Wildberries search failed: {e}")
             raise Exception(f"Wildberries search failed: {str(e)}")
 
+    async def asearch_many(self, queries: List[str]) -> List[List[Product]]:
+        """
+        Search for several queries concurrently over one connection pool.
+        
+        Request starts are still spaced out by the rate limiter, but the
+        requests themselves overlap, so the total time is not the sum of
+        their latencies.
+        
+        Args:
+            queries: Search query strings
+            
+        Returns:
+            One list of Product objects per query, in the order of queries
+            
+        Raises:
+            Exception: If any search fails after maximum retries
+        """
+        async with self._open_session() as session:
+            return await asyncio.gather(*(self.asearch(query, session) for query in queries))
+
+    def _open_session(self) -> aiohttp.ClientSession:
+        """
+        Open an aiohttp session for asynchronous searches.
+        
+        Returns:
+            Session with a bounded connection pool and the request timeout
+        """
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+        )
+
+    def _search_params(self, query: str) -> Dict[str, Any]:
+        """
+        Build the search API query parameters.
+        
+        Args:
+            query: Search query string
+            
+        Returns:
+            Dictionary of query parameters
+        """
+        return {
+            'query': query,
+            'resultset': 'catalog',
+            'limit': 100,
+            'sort': 'popular',  # Sort by popularity
+            'currency': 'RUB',
+            'dest': '-1216603',  # Moscow region by default
+            'spp': 0  # Don't filter by price
+        }
+
+    def _parse_search_response(self, response_data: Dict[str, Any], query: str) -> List[Product]:
+        """
+        Extract products from a normalized search API response.
+        
+        Args:
+            response_data: Normalized response data
+            query: Search query string, for logging
+            
+        Returns:
+            List of Product objects, without malformed entries
+        """
+        products = []
+        raw_products = response_data.get('data', {}).get('products', [])
+        
+        for product_data in raw_products:
+            try:
+                product = self._parse_product_data(product_data)
+                products.append(product)
+            except (KeyError, TypeError, ValueError) as e:
+                # Skip malformed product entries
+                logger.warning(f"Skipping malformed product: {e}")
+                continue
+        
+        logger.info(f"Found {len(products)} products for query: '{query}'")
+        return products
+
     def get_trends(self, query: str) -> 'TrendData':
         """
         Get trend data for a specific query.
@@ -219,6 +448,12 @@ class WildberriesPublicAPI(DataSource):
         """
         Make an HTTP request with Wildberries-specific handling.
         
+        If response_cache_ttl is set, successful GET responses are cached
+        for that many seconds and served from the cache without rate
+        limiting. Failed attempts are retried by the session's adapter,
+        up to max_retries attempts in total, waiting _retry_backoff
+        between them.
+        
         Args:
             url: URL to request
             method: HTTP method (GET, POST, etc.)
@@ -230,10 +465,17 @@ class WildberriesPublicAPI(DataSource):
             Response data as dictionary
             
         Raises:
-            Exception: If request fails after maximum retries
+            requests.exceptions.RetryError: If request fails after maximum retries
+            requests.exceptions.RequestException: If request fails otherwise
+            ValueError: If the response is not valid JSON
         """
-        import requests
-        from requests.exceptions import RequestException
+        cache_key = None
+        if self._response_cache is not None and method.upper() == 'GET':
+            cache_key = self._response_cache_key(url, params)
+            cached = self._response_cache.get(self.source_name, cache_key)
+            if cached is not None:
+                logger.debug(f"Response cache hit: {cache_key}")
+                return cached
         
         # Apply both base and Wildberries rate limiting
         super()._rate_limit()
@@ -249,52 +491,120 @@ class WildberriesPublicAPI(DataSource):
                 if key not in headers:
                     headers[key] = value
         
-        # Retry logic with exponential backoff for 403/429 errors
+        try:
+            response = self.session.request(
+                method=method,
+                url=url,
+                params=params,
+                json=data,
+                headers=headers,
+                timeout=self.request_timeout
+            )
+            
+            # Check for successful response
+            response.raise_for_status()
+            
+            # Parse and normalize response; orjson decodes the raw bytes
+            # much faster than response.json() on Cyrillic-heavy payloads
+            result = self._normalize_response(orjson.loads(response.content))
+        except RetryError as e:
+            # Same message as the asynchronous path when the retries run out
+            error_msg = f"Request failed after {self.max_retries} attempts: {str(e)}"
+            logger.error(error_msg)
+            raise RetryError(error_msg) from e
+        except (RequestException, ValueError) as e:
+            logger.error(f"Request failed: {e}")
+            raise
+        
+        if cache_key is not None:
+            self._response_cache.set(self.source_name, cache_key, result)
+        return result
+
+    async def _amake_request(self, session: aiohttp.ClientSession, url: str,
+                             params: Optional[Dict] = None,
+                             headers: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Make an asynchronous GET request with Wildberries-specific handling.
+        
+        Shares the response cache, token bucket and retry policy of
+        _make_request; as aiohttp has no retrying adapter, failed attempts
+        are retried here.
+        The bucket is waited on with async_sleep_func, so pending requests tie
+        up neither the event loop nor executor threads.
+        
+        Args:
+            session: aiohttp session to send the request with
+            url: URL to request
+            params: Query parameters
+            headers: Request headers
+            
+        Returns:
+            Response data as dictionary
+            
+        Raises:
+            requests.exceptions.RetryError: If request fails after maximum retries
+            aiohttp.ClientResponseError: If the response status is not worth retrying
+            ValueError: If the response is not valid JSON
+        """
+        cache_key = None
+        if self._response_cache is not None:
+            cache_key = self._response_cache_key(url, params)
+            cached = self._response_cache.get(self.source_name, cache_key)
+            if cached is not None:
+                logger.debug(f"Response cache hit: {cache_key}")
+                return cached
+        
+        await self._arate_limit()
+        
+        headers = {**self._get_headers(), **(headers or {})}
+        
         last_exception = None
         for attempt in range(self.max_retries):
             try:
-                # Use requests.request directly to match test mocking
-                response = requests.request(
-                    method=method,
-                    url=url,
-                    params=params,
-                    json=data,
-                    headers=headers,
-                    timeout=self.request_timeout
-                )
-                
-                # Check for successful response
-                response.raise_for_status()
+                async with session.get(url, params=params, headers=headers) as response:
+                    response.raise_for_status()
+                    result = self._normalize_response(orjson.loads(await response.read()))
+                if cache_key is not None:
+                    self._response_cache.set(self.source_name, cache_key, result)
+                return result
                 
-                # Parse and normalize response
-                result = response.json()
-                return self._normalize_response(result)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status = e.status if isinstance(e, aiohttp.ClientResponseError) else None
+                if status is not None and status not in _RETRY_STATUSES:
+                    logger.error(f"Request failed: {e}")
+                    raise
                 
-            except (RequestException, ValueError) as e:
                 last_exception = e
-                error_message = str(e)
-                
-                # Special handling for 403 Forbidden and 429 Too Many Requests
-                if "403" in error_message or "429" in error_message or \
-                   "too many requests" in error_message.lower() or \
-                   "forbidden" in error_message.lower():
-                    if attempt < self.max_retries - 1:
-                        # Exponential backoff specifically for rate limiting/forbidden errors
-                        wait_time = min(60, (2 ** attempt) * 5)  # Max 60 seconds
-                        logger.warning(f"Rate limited/forbidden (attempt {attempt + 1}/{self.max_retries}), retrying in {wait_time} seconds...")
-                        time.sleep(wait_time)
-                        continue
-                
-                # For other errors, use regular backoff
                 if attempt < self.max_retries - 1:
-                    wait_time = (2 ** attempt) * 0.1
+                    wait_time = _retry_backoff(status, attempt)
                     logger.warning(f"Request failed (attempt {attempt + 1}/{self.max_retries}), retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                
+                    await self._async_sleep(wait_time)
+            except ValueError as e:
+                logger.error(f"Request failed: {e}")
+                raise
+        
         # If we get here, all retries failed
         error_msg = f"Request failed after {self.max_retries} attempts: {str(last_exception)}"
         logger.error(error_msg)
-        raise Exception(error_msg)
+        raise RetryError(error_msg)
+
+    def _response_cache_key(self, url: str, params: Optional[Dict]) -> str:
+        """
+        Build the response cache key for a GET request.
+        
+        Args:
+            url: URL to request
+            params: Query parameters
+            
+        Returns:
+            URL with its query parameters in sorted order
+        """
+        return f"{url}?{urlencode(sorted(params.items())) if params else ''}"
+
+    def close(self):
+        """Clean up resources, including the HTTP session."""
+        self.session.close()
+        super().close()
 
 
 # Maintain backward compatibility by aliasing the old class name
@@ -6,6 +6,7 @@ For Wordstat, it uses stub data with realistic numbers since the API requires a
 For Yandex Market, it implements a scraper similar to Wildberries and Ozon.
 """
 
+import re
 import time
 import random
 import threading
@@ -20,6 +21,22 @@ from requests.exceptions import RequestException
 from .base import DataSource, Product, TrendData
 
 
+# Headers sent with every Yandex request, apart from the rotated User-Agent
+_BASE_HEADERS = {
+    'Accept': 'application/json',
+    'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Referer': 'https://market.yandex.ru/',
+    'Origin': 'https://market.yandex.ru'
+}
+
+# Product-related terms that raise a query's stub trend score, matched in
+# a single scan of the lowercased query
+_PRODUCT_TERMS_RE = re.compile('|'.join(map(re.escape, [
+    'купить', 'цена', 'дешево', 'скидка', 'распродажа',
+    'новый', 'лучший', 'отзывы', 'рейтинг', 'топ'
+])))
+
+
 class YandexSearch(DataSource):
     """
     Yandex data source implementation.
@@ -52,6 +69,10 @@ class YandexSearch(DataSource):
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0",
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15"
         ]
+        # Complete header sets, one per User-Agent, copied for each request
+        self._header_variants = tuple(
+            {'User-Agent': user_agent, **_BASE_HEADERS} for user_agent in self.user_agents
+        )
         
         # Rate limiting for Yandex
         # Max 1 request per 2 seconds, max 30 requests per minute
@@ -109,13 +130,7 @@ class YandexSearch(DataSource):
         Returns:
             Dictionary of HTTP headers with User-Agent rotation
         """
-        return {
-            'User-Agent': random.choice(self.user_agents),
-            'Accept': 'application/json',
-            'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Referer': 'https://market.yandex.ru/',
-            'Origin': 'https://market.yandex.ru'
-        }
+        return random.choice(self._header_variants).copy()
 
     def _generate_wordstat_stub_data(self, query: str) -> TrendData:
         """
@@ -139,12 +154,8 @@ class YandexSearch(DataSource):
         base_score += query_length_factor
         
         # Add score for common product-related terms
-        product_terms = ['купить', 'цена', 'дешево', 'скидка', 'распродажа', 
-                        'новый', 'лучший', 'отзывы', 'рейтинг', 'топ']
-        for term in product_terms:
-            if term in query.lower():
-                base_score += 0.1
-                break
+        if _PRODUCT_TERMS_RE.search(query.lower()):
+            base_score += 0.1
         
         # Cap the score at 0.9 (realistic maximum)
         trend_score = min(base_score, 0.9)
@@ -236,7 +247,7 @@ class YandexSearch(DataSource):
             response.raise_for_status()
             
             # Parse HTML to extract product data
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, 'lxml')
             
             # Look for product containers - Yandex Market uses specific classes
             product_containers = soup.find_all('div', class_='n-snippet-card2')
@@ -398,19 +409,29 @@ class YandexSearch(DataSource):
                 if key not in headers:
                     headers[key] = value
         
+        if self.api_key:
+            headers['Authorization'] = f"Bearer {self.api_key}"
+        
         # Retry logic with exponential backoff for 429 errors
         last_exception = None
         for attempt in range(self.max_retries):
             try:
-                response = super()._make_request(
-                    url=url,
+                # One attempt per iteration: the base class would retry on
+                # its own, multiplying the attempts
+                response = requests.request(
                     method=method,
+                    url=url,
                     params=params,
-                    data=data,
-                    headers=headers
+                    json=data,
+                    headers=headers,
+                    timeout=self.request_timeout
                 )
                 
-                return response
+                # Check for successful response
+                response.raise_for_status()
+                
+                # Parse and normalize response
+                return self._normalize_response(response.json())
                 
             except Exception as e:
                 last_exception = e
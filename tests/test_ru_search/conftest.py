@@ -0,0 +1,46 @@
+"""
+Shared fixtures for the ru_search tests.
+
+Provides a manually advanced clock for TTL and rate limiting tests, and a
+fixture making blocking sleeps return immediately and recording them.
+"""
+
+import time
+
+import pytest
+
+
+class FakeClock:
+    """Manually advanced clock for testing TTL expiration and rate limiting without sleeping."""
+
+    def __init__(self, start=1000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def tick(self, seconds):
+        """Advance the clock by the given number of seconds."""
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    """Create a fake clock; pass `clock.tick` as a sleep function to advance it instantly."""
+    return FakeClock()
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """
+    Make rate limiting and retry backoff return immediately.
+    
+    Replaces time.sleep for the whole process, urllib3 and thread pools
+    included, not just for the module under test.
+    
+    Returns:
+        List of the seconds passed to every sleep, in call order
+    """
+    sleeps = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    return sleeps
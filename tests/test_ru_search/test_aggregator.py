@@ -15,6 +15,7 @@ This module tests the MarketDataAggregator class including:
 
 import pytest
 import asyncio
+import threading
 import time
 from unittest.mock import patch, MagicMock, AsyncMock
 from src.ru_search.aggregator import MarketDataAggregator
@@ -178,6 +179,7 @@ class TestMarketDataAggregator:
         error_sources = [error['source'] for error in results['errors']]
         assert 'yandex' in error_sources
         assert 'google_trends' in error_sources
+        assert results['error_sources'] == frozenset({'yandex', 'google_trends'})
         
         # Check data quality reflects the errors
         data_quality = results['data_quality']
@@ -420,6 +422,19 @@ class TestMarketDataAggregator:
         assert mock_yandex_search.call_count == 0
         assert mock_gt_search.call_count == 0
 
+    @pytest.mark.asyncio
+    @patch('src.ru_search.wildberries.WildberriesSearch.search')
+    async def test_search_single_source_failure(self, mock_wb_search):
+        """Test that a failing single source is reported as an error."""
+        mock_wb_search.side_effect = Exception("Wildberries unavailable")
+        
+        results = await self.aggregator.search(self.test_query, sources=['wildberries'], use_cache=False)
+        
+        assert results['results'] == []
+        assert results['summary']['failed_sources'] == 1
+        assert results['error_sources'] == frozenset({'wildberries'})
+        assert 'Wildberries unavailable' in results['source_results']['wildberries']['error']
+
     @pytest.mark.asyncio
     @patch('src.ru_search.wildberries.WildberriesSearch.search')
     @patch('src.ru_search.ozon.OzonSearch.search')
@@ -444,6 +459,22 @@ class TestMarketDataAggregator:
         
         assert "timed out after 1 seconds" in str(exc_info.value)
 
+    @pytest.mark.asyncio
+    @patch('src.ru_search.wildberries.WildberriesSearch.search')
+    async def test_search_single_source_timeout(self, mock_wb_search):
+        """Test that the single-source path times out like the parallel one."""
+        def slow_search(*args, **kwargs):
+            time.sleep(1.5)
+            return [Product(id="wb1", title="Телефон Wildberries 1", price=10000.0, url="https://wb.ru/p1")]
+        
+        mock_wb_search.side_effect = slow_search
+        
+        with pytest.raises(Exception, match="timed out after 1 seconds"):
+            await self.aggregator.search(self.test_query, sources=['wildberries'], timeout=1)
+        
+        # Nothing was cached for the timed-out search
+        assert self.aggregator.cache.get('wildberries', self.test_query) is None
+
     @pytest.mark.asyncio
     @patch('src.ru_search.wildberries.WildberriesSearch.get_trends')
     @patch('src.ru_search.ozon.OzonSearch.get_trends')
@@ -625,12 +656,12 @@ class TestMarketDataAggregator:
         self.aggregator.cache.set("wildberries", "телефон", {"test": "data1"})
         self.aggregator.cache.set("ozon", "телефон", {"test": "data2"})
         
-        assert len(self.aggregator.cache._cache) == 2
+        assert len(self.aggregator.cache) == 2
         
         # Clear cache
         self.aggregator.clear_cache()
         
-        assert len(self.aggregator.cache._cache) == 0
+        assert len(self.aggregator.cache) == 0
 
     def test_context_manager(self):
         """Test context manager functionality."""
@@ -644,6 +675,37 @@ class TestMarketDataAggregator:
         assert aggregator2.cache_ttl == 21600
         aggregator2.close()
 
+    def test_sources_created_lazily(self):
+        """Test that data sources are only created when first used."""
+        assert self.aggregator._sources == {}
+        
+        wildberries = self.aggregator.wildberries
+        
+        assert list(self.aggregator._sources) == ['wildberries']
+        assert self.aggregator.wildberries is wildberries
+
+    @pytest.mark.asyncio
+    @patch('src.ru_search.wildberries.WildberriesSearch.search')
+    async def test_search_source_creation_failure(self, mock_wb_search):
+        """Test that a source failing to initialize is reported as an error, off the event loop."""
+        mock_wb_search.return_value = []
+        factory_threads = []
+        
+        def failing_factory():
+            factory_threads.append(threading.current_thread())
+            raise ConnectionError("Google Trends unreachable")
+        
+        self.aggregator.available_sources['google_trends']['factory'] = failing_factory
+        
+        results = await self.aggregator.search(
+            self.test_query, sources=['wildberries', 'google_trends'], use_cache=False
+        )
+        
+        assert results['error_sources'] == frozenset({'google_trends'})
+        assert 'Google Trends unreachable' in results['source_results']['google_trends']['error']
+        assert 'google_trends' not in self.aggregator._sources
+        assert factory_threads and threading.main_thread() not in factory_threads
+
     @pytest.mark.asyncio
     @patch('src.ru_search.wildberries.WildberriesSearch.search')
     @patch('src.ru_search.ozon.OzonSearch.search')
@@ -9,24 +9,26 @@ This module tests the SearchCache class including:
 - Cache clearing
 """
 
+import pickle
 import pytest
 import time
 import threading
-from src.ru_search.cache import SearchCache
+from src.ru_search.cache import SearchCache, _CacheEntry
 
 
 class TestSearchCache:
     """Test suite for SearchCache class."""
 
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def _inject(self, clock):
         """Setup test fixtures."""
-        self.cache = SearchCache(ttl=2)  # Short TTL for testing
+        self.clock = clock
+        self.cache = SearchCache(ttl=2, time_func=clock)  # Short TTL for testing
         
     def test_cache_initialization(self):
         """Test cache initialization."""
         assert self.cache.ttl == 2
-        assert isinstance(self.cache._cache, dict)
-        assert len(self.cache._cache) == 0
+        assert len(self.cache) == 0
 
     def test_make_key(self):
         """Test cache key generation."""
@@ -59,7 +61,7 @@ class TestSearchCache:
         cached_data = self.cache.get("wildberries", "телефон")
         
         assert cached_data == test_data
-        assert len(self.cache._cache) == 1
+        assert len(self.cache) == 1
 
     def test_cache_miss(self):
         """Test cache miss behavior."""
@@ -79,15 +81,15 @@ class TestSearchCache:
         cached_data = self.cache.get("wildberries", "телефон")
         assert cached_data == test_data
         
-        # Wait for expiration (TTL is 2 seconds)
-        time.sleep(3)
+        # Advance past expiration (TTL is 2 seconds)
+        self.clock.tick(3)
         
         # Should be expired and return None
         cached_data = self.cache.get("wildberries", "телефон")
         assert cached_data is None
         
         # Cache should be empty after expiration
-        assert len(self.cache._cache) == 0
+        assert len(self.cache) == 0
 
     def test_cache_multiple_entries(self):
         """Test multiple cache entries."""
@@ -101,7 +103,7 @@ class TestSearchCache:
         self.cache.set("wildberries", "смартфон", test_data3)
         
         # Verify all entries are stored
-        assert len(self.cache._cache) == 3
+        assert len(self.cache) == 3
         
         # Verify each entry can be retrieved
         assert self.cache.get("wildberries", "телефон") == test_data1
@@ -122,7 +124,7 @@ class TestSearchCache:
         assert self.cache.get("wildberries", "телефон") == test_data2
         
         # Should still have only one entry
-        assert len(self.cache._cache) == 1
+        assert len(self.cache) == 1
 
     def test_cache_clear(self):
         """Test cache clearing."""
@@ -132,13 +134,13 @@ class TestSearchCache:
         # Set multiple entries
         self.cache.set("wildberries", "телефон", test_data1)
         self.cache.set("ozon", "телефон", test_data2)
-        assert len(self.cache._cache) == 2
+        assert len(self.cache) == 2
         
         # Clear cache
         self.cache.clear()
         
         # Cache should be empty
-        assert len(self.cache._cache) == 0
+        assert len(self.cache) == 0
         assert self.cache.get("wildberries", "телефон") is None
         assert self.cache.get("ozon", "телефон") is None
 
@@ -148,25 +150,24 @@ class TestSearchCache:
         old_data = {"products": [{"id": 1, "name": "old"}], "timestamp": time.time() - 10}
         new_data = {"products": [{"id": 2, "name": "new"}], "timestamp": time.time()}
         
-        # Manually set old entry (bypassing normal set method)
+        # Manually store old entry (bypassing timestamping in set method)
         old_key = self.cache._make_key("wildberries", "old_query")
-        self.cache._cache[old_key] = {
-            'timestamp': time.time() - 10,  # 10 seconds old
-            'data': old_data,
-            'source': 'wildberries',
-            'query_hash': old_key.split(':')[1]
-        }
+        self.cache._store(old_key, _CacheEntry(
+            timestamp=self.cache._now() - 10,  # 10 seconds old
+            data=old_data,
+            source='wildberries'
+        ))
         
         # Set new entry normally
         self.cache.set("wildberries", "new_query", new_data)
         
-        assert len(self.cache._cache) == 2
+        assert len(self.cache) == 2
         
         # Run cleanup
         self.cache._cleanup_expired()
         
         # Should only have the new entry
-        assert len(self.cache._cache) == 1
+        assert len(self.cache) == 1
         assert self.cache.get("wildberries", "new_query") == new_data
         assert self.cache.get("wildberries", "old_query") is None
 
@@ -200,30 +201,60 @@ class TestSearchCache:
         
         # Verify cache integrity
         # Should have some entries (exact count may vary due to race conditions)
-        assert len(self.cache._cache) > 0
+        assert len(self.cache) > 0
         
         # Verify we can still read and write
         self.cache.set("test", "test", {"final": "test"})
         assert self.cache.get("test", "test") == {"final": "test"}
 
+    def test_concurrent_reads_during_writes(self):
+        """Test lock-free reads while writers insert, evict and expire entries."""
+        cache = SearchCache(ttl=60, maxsize=32, time_func=self.clock)
+        errors = []
+        
+        def writer():
+            try:
+                for i in range(2000):
+                    cache.set("wildberries", f"query{i % 100}", {"data": i})
+            except Exception as e:
+                errors.append(e)
+        
+        def reader():
+            try:
+                for i in range(2000):
+                    data = cache.get("wildberries", f"query{i % 100}")
+                    assert data is None or "data" in data
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=writer) for _ in range(2)]
+        threads += [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert errors == []
+        assert len(cache) <= 32
+
     def test_cache_with_different_ttl(self):
         """Test cache with different TTL values."""
         # Test with very short TTL
-        short_cache = SearchCache(ttl=1)
+        short_cache = SearchCache(ttl=1, time_func=self.clock)
         test_data = {"products": [{"id": 1, "name": "test"}]}
         
         short_cache.set("wildberries", "телефон", test_data)
         assert short_cache.get("wildberries", "телефон") == test_data
         
-        time.sleep(2)
+        self.clock.tick(2)
         assert short_cache.get("wildberries", "телефон") is None
         
         # Test with longer TTL
-        long_cache = SearchCache(ttl=10)
+        long_cache = SearchCache(ttl=10, time_func=self.clock)
         long_cache.set("wildberries", "телефон", test_data)
         assert long_cache.get("wildberries", "телефон") == test_data
         
-        time.sleep(2)
+        self.clock.tick(2)
         # Should still be available
         assert long_cache.get("wildberries", "телефон") == test_data
 
@@ -249,6 +280,28 @@ class TestSearchCache:
         assert self.cache.get("wildberries", "телефон ") == {"data": "with_space"}
         assert self.cache.get("wildberries", "Телефон") == {"data": "uppercase"}
 
+    def test_make_key_short_ascii_fast_path(self):
+        """Test that short ASCII queries are embedded in the key unhashed."""
+        key = self.cache._make_key("wildberries", "iphone")
+        assert key == "wildberries:=iphone"
+        
+        # ASCII lookalikes of Cyrillic queries still get distinct keys
+        assert self.cache._make_key("wildberries", "apple") != self.cache._make_key("wildberries", "аpple")
+        
+        # Separators are escaped, so the key keeps a single ':' and stays unambiguous
+        colon_key = self.cache._make_key("wildberries", "a:b")
+        assert len(colon_key.split(":")) == 2
+        assert colon_key != self.cache._make_key("wildberries", "a%3Ab")
+        
+        # A query that looks like a hash cannot collide with a hashed key
+        hashed_key = self.cache._make_key("wildberries", "телефон")
+        hash_part = hashed_key.split(":")[1]
+        assert self.cache._make_key("wildberries", hash_part) != hashed_key
+        
+        # Long queries are hashed
+        long_key = self.cache._make_key("wildberries", "a" * 65)
+        assert len(long_key.split(":")[1]) == 32
+
     def test_cache_metadata_storage(self):
         """Test that cache stores metadata correctly."""
         test_data = {"products": [{"id": 1, "name": "test"}]}
@@ -258,15 +311,45 @@ class TestSearchCache:
         
         # Check internal cache structure
         key = self.cache._make_key("wildberries", "телефон")
-        cached_item = self.cache._cache[key]
-        
-        assert 'timestamp' in cached_item
-        assert 'data' in cached_item
-        assert 'source' in cached_item
-        assert 'query_hash' in cached_item
-        assert cached_item['source'] == "wildberries"
-        assert cached_item['data'] == test_data
-        assert cached_item['query_hash'] == key.split(':')[1]
+        cached_item = self.cache._shard(key).entries[key]
+        
+        assert cached_item.timestamp == self.clock()
+        assert cached_item.source == "wildberries"
+        assert cached_item.loader(cached_item.data) == test_data
+        assert key.split(':')[0] == "wildberries"
+        assert not hasattr(cached_item, '__dict__')
+
+    def test_cache_compresses_large_values(self):
+        """Test that large values are stored compressed and restored on get."""
+        large_data = {
+            "historical_data": [
+                {"date": f"2024-01-{i % 28 + 1:02d}", "search_volume": i, "trend_index": i / 100.0}
+                for i in range(365)
+            ]
+        }
+        small_data = {"products": [{"id": 1, "name": "test"}]}
+        
+        self.cache.set("google_trends", "large", large_data)
+        self.cache.set("google_trends", "small", small_data)
+        
+        large_key = self.cache._make_key("google_trends", "large")
+        large_item = self.cache._shard(large_key).entries[large_key]
+        assert large_item.loader is not pickle.loads
+        assert isinstance(large_item.data, bytes)
+        assert self.cache.get("google_trends", "large") == large_data
+        
+        # Small values are only pickled
+        small_key = self.cache._make_key("google_trends", "small")
+        small_item = self.cache._shard(small_key).entries[small_key]
+        assert small_item.loader is pickle.loads
+        assert self.cache.get("google_trends", "small") == small_data
+        
+        # Compression can be disabled
+        uncompressed_cache = SearchCache(compress_threshold=None)
+        uncompressed_cache.set("google_trends", "large", large_data)
+        large_key_item = uncompressed_cache._shard(large_key).entries[large_key]
+        assert large_key_item.loader is pickle.loads
+        assert uncompressed_cache.get("google_trends", "large") == large_data
 
     def test_cache_with_complex_data(self):
         """Test cache with complex data structures."""
@@ -301,6 +384,17 @@ class TestSearchCache:
         cached_data = self.cache.get("wildberries", "телефон")
         assert cached_data == complex_data
         assert cached_data["products"][0]["metadata"]["nested"]["deep"]["value"] == "test"
+        
+        # Mutating a result must not corrupt the cached entry
+        cached_data["products"][0]["metadata"]["nested"]["deep"]["value"] = "changed"
+        cached_data["summary"]["brands"].append("other")
+        assert cached_data is not complex_data
+        assert self.cache.get("wildberries", "телефон") == complex_data
+        
+        # Values that cannot be pickled are cached as they are
+        unpicklable = {"lock": threading.Lock()}
+        self.cache.set("wildberries", "lock", unpicklable)
+        assert self.cache.get("wildberries", "lock") is unpicklable
 
     def test_cache_edge_cases(self):
         """Test cache edge cases."""
@@ -345,4 +439,76 @@ class TestSearchCache:
         # Should be fast (less than 1 second for 100 operations)
         assert set_time < 1.0
         assert get_time < 1.0
-        assert len(self.cache._cache) == 100
\ No newline at end of file
+        assert len(self.cache) == 100
+
+    def _same_shard_queries(self, cache, source, count):
+        """Find queries whose keys land in the same cache shard."""
+        target = cache._shard(cache._make_key(source, "query0"))
+        queries = []
+        i = 0
+        while len(queries) < count:
+            query = f"query{i}"
+            if cache._shard(cache._make_key(source, query)) is target:
+                queries.append(query)
+            i += 1
+        return queries
+
+    def test_cache_maxsize_bounds_entries(self):
+        """Test that the cache never grows past maxsize."""
+        cache = SearchCache(ttl=60, maxsize=32)
+        
+        for i in range(500):
+            cache.set("wildberries", f"query{i}", {"data": i})
+        
+        assert len(cache) <= 32
+        # The most recent entry is always kept
+        assert cache.get("wildberries", "query499") == {"data": 499}
+
+    @pytest.mark.parametrize("maxsize", [16, 20, 47])
+    def test_cache_maxsize_not_multiple_of_shards(self, maxsize):
+        """Test that maxsize bounds the cache when it does not split evenly across shards."""
+        cache = SearchCache(ttl=60, maxsize=maxsize)
+        
+        for i in range(500):
+            cache.set("wildberries", f"query{i}", {"data": i})
+        
+        assert len(cache) <= maxsize
+
+    def test_cache_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = SearchCache(ttl=60, maxsize=32)  # 2 entries per shard
+        q0, q1, q2 = self._same_shard_queries(cache, "wildberries", 3)
+        
+        cache.set("wildberries", q0, {"data": 0})
+        cache.set("wildberries", q1, {"data": 1})
+        cache.get("wildberries", q0)  # q0 becomes most recently used
+        cache.set("wildberries", q2, {"data": 2})
+        
+        assert cache.get("wildberries", q0) == {"data": 0}
+        assert cache.get("wildberries", q1) is None
+        assert cache.get("wildberries", q2) == {"data": 2}
+
+    def test_cache_lfu_eviction(self):
+        """Test that the least frequently used entry is evicted first."""
+        cache = SearchCache(ttl=60, maxsize=32, policy='lfu')
+        q0, q1, q2 = self._same_shard_queries(cache, "wildberries", 3)
+        
+        cache.set("wildberries", q0, {"data": 0})
+        cache.set("wildberries", q1, {"data": 1})
+        cache.get("wildberries", q1)
+        cache.get("wildberries", q1)
+        cache.get("wildberries", q0)
+        cache.set("wildberries", q2, {"data": 2})
+        
+        assert cache.get("wildberries", q0) is None
+        assert cache.get("wildberries", q1) == {"data": 1}
+        assert cache.get("wildberries", q2) == {"data": 2}
+
+    def test_cache_invalid_configuration(self):
+        """Test that invalid maxsize and policy values are rejected."""
+        with pytest.raises(ValueError):
+            SearchCache(maxsize=0)
+        with pytest.raises(ValueError, match="maxsize must be at least 16, got 1"):
+            SearchCache(maxsize=1)
+        with pytest.raises(ValueError):
+            SearchCache(policy='fifo')
@@ -6,24 +6,78 @@ testing all major functionality including interest over time, related queries,
 rate limiting, caching, and error handling.
 """
 
+import gc
 import pytest
-import time
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
 from unittest.mock import patch, MagicMock
 import pandas as pd
 from datetime import datetime, timedelta
 
-from src.ru_search.google_trends import GoogleTrendsAPI
+from src.ru_search.google_trends import GoogleTrendsAPI, _trends_client_pool
 from src.ru_search.base import TrendData
 
 
+@dataclass
+class FakeTrendsClient:
+    """Stand-in for pytrends' TrendReq returning preconfigured data."""
+    
+    interest_data: Optional[pd.DataFrame] = None
+    related_data: Optional[Dict[str, Any]] = None
+    error: Optional[Exception] = None
+    payloads: List[list] = field(default_factory=list)
+    interest_calls: int = 0
+    related_calls: int = 0
+    
+    def build_payload(self, kw_list, **kwargs):
+        self.payloads.append(kw_list)
+    
+    def interest_over_time(self):
+        self.interest_calls += 1
+        if self.error is not None:
+            raise self.error
+        return self.interest_data
+    
+    def related_queries(self):
+        self.related_calls += 1
+        if self.error is not None:
+            raise self.error
+        return self.related_data
+
+
+def make_interest_data(query, values):
+    """Build an interest-over-time DataFrame ending yesterday."""
+    dates = [datetime.now() - timedelta(days=i) for i in range(len(values), 0, -1)]
+    return pd.DataFrame({'date': dates, query: values}).set_index('date')
+
+
+@pytest.fixture(autouse=True)
+def empty_trends_pool():
+    """Empty the pytrends client pool so patched TrendReq classes are used."""
+    _trends_client_pool.clear()
+    yield
+    _trends_client_pool.clear()
+
+
+@pytest.fixture
+def trends_client():
+    """Create a fake pytrends client."""
+    return FakeTrendsClient()
+
+
+@pytest.fixture
+def google_trends(clock, trends_client):
+    """Create a GoogleTrendsAPI instance with its own cache, clock and client."""
+    api = GoogleTrendsAPI(trends_client=trends_client, time_func=clock, sleep_func=clock.tick)
+    yield api
+    api.close()
+
+
 class TestGoogleTrendsAPI:
     """Test class for GoogleTrendsAPI functionality."""
     
-    @pytest.fixture
-    def google_trends(self):
-        """Create a GoogleTrendsAPI instance for testing."""
-        return GoogleTrendsAPI()
-    
     def test_initialization(self, google_trends):
         """Test that GoogleTrendsAPI initializes correctly."""
         assert google_trends.source_name == "google_trends"
@@ -33,165 +87,185 @@ class TestGoogleTrendsAPI:
         assert google_trends.request_interval == 5
         assert google_trends.cache is not None
     
-    def test_get_interest_over_time_basic(self, google_trends):
+    def test_get_interest_over_time_basic(self, google_trends, trends_client):
         """Test basic interest over time functionality."""
-        # Mock the pytrends client to avoid actual API calls
-        with patch.object(google_trends.trends_client, 'build_payload') as mock_build, \
-             patch.object(google_trends.trends_client, 'interest_over_time') as mock_interest:
-            
-            # Create mock data
-            dates = [datetime.now() - timedelta(days=i) for i in range(30, 0, -1)]
-            values = [i for i in range(50, 80)]  # Same length as dates
-            mock_data = pd.DataFrame({
-                'date': dates,
-                'test_query': values
-            })
-            mock_data = mock_data.set_index('date')
-            mock_interest.return_value = mock_data
-            
-            # Call the method
-            result = google_trends.get_interest_over_time('test_query')
-            
-            # Verify results
-            assert isinstance(result, TrendData)
-            assert result.query == 'test_query'
-            assert 0.0 <= result.trend_score <= 1.0
-            assert len(result.historical_data) > 0
-            
-            # Verify cache was used
-            cached_data = google_trends._get_cached_data('test_query', 'interest_over_time')
-            assert cached_data is not None
+        trends_client.interest_data = make_interest_data('test_query', list(range(50, 80)))
+        
+        # Call the method
+        result = google_trends.get_interest_over_time('test_query')
+        
+        # Verify results
+        assert isinstance(result, TrendData)
+        assert result.query == 'test_query'
+        assert 0.0 <= result.trend_score <= 1.0
+        assert len(result.historical_data) > 0
+        assert trends_client.payloads == [['test_query']]
+        
+        # Verify cache was used
+        cached_data = google_trends._get_cached_data('test_query', 'interest_over_time')
+        assert cached_data is not None
     
-    def test_get_interest_over_time_cache(self, google_trends):
+    def test_get_interest_over_time_cache(self, google_trends, trends_client):
         """Test caching functionality for interest over time."""
-        # First call - should not use cache
-        with patch.object(google_trends.trends_client, 'build_payload'), \
-             patch.object(google_trends.trends_client, 'interest_over_time') as mock_interest:
-            
-            dates = [datetime.now() - timedelta(days=i) for i in range(10, 0, -1)]
-            values = [i * 10 for i in range(10, 20)]
-            mock_data = pd.DataFrame({
-                'date': dates,
-                'cached_query': values
-            })
-            mock_data = mock_data.set_index('date')
-            mock_interest.return_value = mock_data
-            
-            result1 = google_trends.get_interest_over_time('cached_query', use_cache=False)
-            assert mock_interest.call_count == 1
+        trends_client.interest_data = make_interest_data('cached_query', [i * 10 for i in range(10, 20)])
+        
+        # First call - cache miss, populates the cache
+        result1 = google_trends.get_interest_over_time('cached_query', use_cache=True)
+        assert trends_client.interest_calls == 1
         
         # Second call with cache - should use cache
-        with patch.object(google_trends.trends_client, 'interest_over_time') as mock_interest:
-            result2 = google_trends.get_interest_over_time('cached_query', use_cache=True)
-            assert mock_interest.call_count == 0  # Should not call API
-            assert result2.query == result1.query
-            # Note: trend_score might differ slightly due to processing, so just check it's reasonable
-            assert 0.0 <= result2.trend_score <= 1.0
+        result2 = google_trends.get_interest_over_time('cached_query', use_cache=True)
+        assert trends_client.interest_calls == 1  # Should not call API again
+        assert result2.query == result1.query
+        # Note: trend_score might differ slightly due to processing, so just check it's reasonable
+        assert 0.0 <= result2.trend_score <= 1.0
     
-    def test_get_related_queries_basic(self, google_trends):
+    def test_get_interest_over_time_single_flight(self, google_trends, trends_client, monkeypatch):
+        """Test that concurrent misses for the same query call the API once."""
+        trends_client.interest_data = make_interest_data('shared_query', [10, 20, 30])
+        fetch_interest = trends_client.interest_over_time
+        release = threading.Event()
+        
+        def slow_interest_over_time():
+            release.wait(timeout=5)
+            return fetch_interest()
+        
+        trends_client.interest_over_time = slow_interest_over_time
+        
+        # Count the threads that join the fetch already in flight
+        join_flight = google_trends._join_flight
+        joined = threading.Semaphore(0)
+        
+        def counting_join_flight(query, method):
+            flight, is_owner = join_flight(query, method)
+            if not is_owner:
+                joined.release()
+            return flight, is_owner
+        
+        monkeypatch.setattr(google_trends, '_join_flight', counting_join_flight)
+        
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(google_trends.get_interest_over_time('shared_query')))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        
+        # Release the first fetch only once the other two threads wait on it
+        assert joined.acquire(timeout=5) and joined.acquire(timeout=5)
+        assert len(google_trends._inflight) == 1
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        assert trends_client.interest_calls == 1
+        assert len(results) == 3
+        assert all(len(result.historical_data) == 3 for result in results)
+        assert google_trends._inflight == {}
+    
+    def test_get_related_queries_basic(self, google_trends, trends_client):
         """Test basic related queries functionality."""
-        # Mock the pytrends client
-        with patch.object(google_trends.trends_client, 'build_payload') as mock_build, \
-             patch.object(google_trends.trends_client, 'related_queries') as mock_related:
-            
-            # Create mock related queries data
-            mock_related_data = {
-                'test_query': {
-                    'rising': pd.DataFrame({
-                        'query': ['rising_query_1', 'rising_query_2'],
-                        'value': [100, 80]
-                    }),
-                    'top': pd.DataFrame({
-                        'query': ['top_query_1', 'top_query_2'],
-                        'value': [200, 180]
-                    })
-                }
+        trends_client.related_data = {
+            'test_query': {
+                'rising': pd.DataFrame({
+                    'query': ['rising_query_1', 'rising_query_2'],
+                    'value': [100, 80]
+                }),
+                'top': pd.DataFrame({
+                    'query': ['top_query_1', 'top_query_2'],
+                    'value': [200, 180]
+                })
             }
-            mock_related.return_value = mock_related_data
-            
-            # Call the method
-            result = google_trends.get_related_queries('test_query')
-            
-            # Verify results
-            assert 'query' in result
-            assert result['query'] == 'test_query'
-            assert 'rising_queries' in result
-            assert 'top_queries' in result
-            assert len(result['rising_queries']) == 2
-            assert len(result['top_queries']) == 2
-            assert result['rising_queries'][0]['query'] == 'rising_query_1'
-            assert result['top_queries'][0]['query'] == 'top_query_1'
+        }
+        
+        # Call the method
+        result = google_trends.get_related_queries('test_query')
+        
+        # Verify results
+        assert 'query' in result
+        assert result['query'] == 'test_query'
+        assert 'rising_queries' in result
+        assert 'top_queries' in result
+        assert len(result['rising_queries']) == 2
+        assert len(result['top_queries']) == 2
+        assert result['rising_queries'][0]['query'] == 'rising_query_1'
+        assert result['top_queries'][0]['query'] == 'top_query_1'
     
-    def test_get_related_queries_cache(self, google_trends):
+    def test_get_related_queries_cache(self, google_trends, trends_client):
         """Test caching functionality for related queries."""
-        # First call - should not use cache
-        with patch.object(google_trends.trends_client, 'build_payload'), \
-             patch.object(google_trends.trends_client, 'related_queries') as mock_related:
-            
-            mock_data = {
-                'cache_test': {
-                    'rising': pd.DataFrame({'query': ['rising'], 'value': [50]}),
-                    'top': pd.DataFrame({'query': ['top'], 'value': [100]})
-                }
+        trends_client.related_data = {
+            'cache_test': {
+                'rising': pd.DataFrame({'query': ['rising'], 'value': [50]}),
+                'top': pd.DataFrame({'query': ['top'], 'value': [100]})
             }
-            mock_related.return_value = mock_data
-            
-            result1 = google_trends.get_related_queries('cache_test', use_cache=False)
-            assert mock_related.call_count == 1
+        }
+        
+        # First call - cache miss, populates the cache
+        result1 = google_trends.get_related_queries('cache_test', use_cache=True)
+        assert trends_client.related_calls == 1
         
         # Second call with cache - should use cache
-        with patch.object(google_trends.trends_client, 'related_queries') as mock_related:
-            result2 = google_trends.get_related_queries('cache_test', use_cache=True)
-            assert mock_related.call_count == 0  # Should not call API
-            assert result2['query'] == result1['query']
+        result2 = google_trends.get_related_queries('cache_test', use_cache=True)
+        assert trends_client.related_calls == 1  # Should not call API again
+        assert result2['query'] == result1['query']
     
-    def test_rate_limiting(self, google_trends):
+    def test_rate_limiting(self, google_trends, clock):
         """Test that rate limiting works correctly."""
         # Test minimum interval rate limiting
-        start_time = time.time()
+        start_time = clock()
         
         # First call should be immediate
         google_trends._google_trends_rate_limit()
-        first_call_time = time.time() - start_time
+        first_call_time = clock() - start_time
+        assert first_call_time == 0
         
         # Second call should wait for minimum interval
         google_trends._google_trends_rate_limit()
-        second_call_time = time.time() - start_time
+        second_call_time = clock() - start_time
         
         # Should be at least the request interval (5 seconds)
         assert second_call_time - first_call_time >= google_trends.request_interval - 0.1
     
-    def test_error_handling_interest_over_time(self, google_trends):
+    def test_rate_limiting_sleeps_only_remaining_interval(self, google_trends, clock):
+        """Test that rate limiting only waits for the rest of the interval."""
+        google_trends._sleep = MagicMock(side_effect=clock.tick)
+        
+        google_trends._google_trends_rate_limit()
+        
+        # Part of the interval has already passed
+        clock.tick(3)
+        google_trends._google_trends_rate_limit()
+        google_trends._sleep.assert_called_once_with(google_trends.request_interval - 3)
+        
+        # Calls spaced further apart than the interval do not wait at all
+        clock.tick(google_trends.request_interval + 1)
+        google_trends._google_trends_rate_limit()
+        assert google_trends._sleep.call_count == 1
+    
+    def test_error_handling_interest_over_time(self, google_trends, trends_client):
         """Test error handling for interest over time."""
-        # Mock the pytrends client to raise an exception
-        with patch.object(google_trends.trends_client, 'build_payload') as mock_build, \
-             patch.object(google_trends.trends_client, 'interest_over_time') as mock_interest:
-            
-            mock_interest.side_effect = Exception("API error")
-            
-            # Should return fallback data instead of raising exception
-            result = google_trends.get_interest_over_time('error_test')
-            
-            assert isinstance(result, TrendData)
-            assert result.query == 'error_test'
-            assert result.trend_score == 0.5  # Fallback neutral score
-            assert len(result.historical_data) == 0
+        trends_client.error = Exception("API error")
+        
+        # Should return fallback data instead of raising exception
+        result = google_trends.get_interest_over_time('error_test')
+        
+        assert isinstance(result, TrendData)
+        assert result.query == 'error_test'
+        assert result.trend_score == 0.5  # Fallback neutral score
+        assert len(result.historical_data) == 0
     
-    def test_error_handling_related_queries(self, google_trends):
+    def test_error_handling_related_queries(self, google_trends, trends_client):
         """Test error handling for related queries."""
-        # Mock the pytrends client to raise an exception
-        with patch.object(google_trends.trends_client, 'build_payload') as mock_build, \
-             patch.object(google_trends.trends_client, 'related_queries') as mock_related:
-            
-            mock_related.side_effect = Exception("API error")
-            
-            # Should return fallback data instead of raising exception
-            result = google_trends.get_related_queries('error_test')
-            
-            assert 'query' in result
-            assert result['query'] == 'error_test'
-            assert len(result['rising_queries']) == 0
-            assert len(result['top_queries']) == 0
+        trends_client.error = Exception("API error")
+        
+        # Should return fallback data instead of raising exception
+        result = google_trends.get_related_queries('error_test')
+        
+        assert 'query' in result
+        assert result['query'] == 'error_test'
+        assert len(result['rising_queries']) == 0
+        assert len(result['top_queries']) == 0
     
     def test_get_trends_compatibility(self, google_trends):
         """Test that get_trends method works as compatibility layer."""
@@ -237,6 +311,20 @@ class TestGoogleTrendsAPI:
         assert result.trend_score == 0.5  # Fallback neutral score
         assert len(result.historical_data) == 0
     
+    def test_process_interest_data_values(self, google_trends):
+        """Test conversion of interest data, skipping missing points."""
+        interest_df = pd.DataFrame(
+            {'test_query': [50, None, 100]},
+            index=pd.DatetimeIndex(['2024-01-01', '2024-01-02', '2024-01-03'], name='date')
+        )
+        result = google_trends._process_interest_data(interest_df, 'test_query')
+        
+        assert result.trend_score == pytest.approx(0.75)
+        assert result.historical_data == [
+            {'date': '2024-01-01', 'search_volume': 50, 'trend_index': 0.5},
+            {'date': '2024-01-03', 'search_volume': 100, 'trend_index': 1.0},
+        ]
+    
     def test_process_related_queries_empty(self, google_trends):
         """Test processing of empty related queries data."""
         empty_df = pd.DataFrame()
@@ -252,65 +340,102 @@ class TestGoogleTrendsAPI:
 class TestGoogleTrendsIntegration:
     """Integration tests for GoogleTrendsAPI."""
     
-    def test_context_manager(self):
+    def test_context_manager(self, trends_client):
         """Test that GoogleTrendsAPI works as a context manager."""
-        with GoogleTrendsAPI() as api:
+        with GoogleTrendsAPI(trends_client=trends_client) as api:
             assert api.source_name == "google_trends"
             # Context manager should work without errors
         # After context, resources should be cleaned up
     
-    def test_multiple_queries_caching(self):
+    def test_multiple_queries_caching(self, google_trends, trends_client):
         """Test multiple queries with caching enabled."""
-        api = GoogleTrendsAPI()
+        api = google_trends
         
         # Test with a single query first to verify caching works
         query = 'test_query'
         
-        # First call - should not use cache
-        with patch.object(api.trends_client, 'build_payload'), \
-             patch.object(api.trends_client, 'interest_over_time') as mock_interest:
-            
-            # Set up mock data that works with the actual processing
-            dates = [datetime.now() - timedelta(days=i) for i in range(5, 0, -1)]
-            mock_data = pd.DataFrame({
-                'date': dates,
-                query: [10, 20, 30, 40, 50],
-                'isPartial': [False, False, False, False, False]
-            }).set_index('date')
-            
-            mock_interest.return_value = mock_data
-            
-            # First call (should call API)
-            result1 = api.get_interest_over_time(query, use_cache=False)
-            
-            # Should be 1 call
-            assert mock_interest.call_count == 1
+        # Set up mock data that works with the actual processing
+        mock_data = make_interest_data(query, [10, 20, 30, 40, 50])
+        mock_data['isPartial'] = False
+        trends_client.interest_data = mock_data
         
-        # Second call with cache - should use cache
-        with patch.object(api.trends_client, 'interest_over_time') as mock_interest:
-            # Second call (should use cache)
-            result2 = api.get_interest_over_time(query, use_cache=True)
+        # First call (should call API and populate the cache)
+        result1 = api.get_interest_over_time(query, use_cache=True)
+        
+        # Should be 1 call
+        assert trends_client.interest_calls == 1
+        
+        # Second call (should use cache)
+        result2 = api.get_interest_over_time(query, use_cache=True)
+        
+        # Should be no additional API calls
+        assert trends_client.interest_calls == 1
+        
+        # Results should be the same - compare the trend scores directly
+        # Since caching works, the trend scores should match
+        assert result1.query == result2.query
+        # Allow for small floating point differences
+        assert abs(result1.trend_score - result2.trend_score) < 0.01
+    
+    def test_trends_client_per_thread(self):
+        """Test that each thread gets its own pytrends client."""
+        with patch('src.ru_search.google_trends.TrendReq', side_effect=lambda **kwargs: MagicMock()) as mock_trend_req:
+            api = GoogleTrendsAPI()
+            main_client = api.trends_client
             
-            # Should be 0 calls (no additional API calls)
-            assert mock_interest.call_count == 0
+            thread_clients = []
+            thread = threading.Thread(target=lambda: thread_clients.append(api.trends_client))
+            thread.start()
+            thread.join()
+        
+        # The constructing thread keeps its client; the other thread built its own
+        assert api.trends_client is main_client
+        assert thread_clients[0] is not main_client
+        assert mock_trend_req.call_count == 2
+        api.close()
+    
+    def test_trends_client_pooled(self):
+        """Test that instances on the same thread share a pooled pytrends client."""
+        with patch('src.ru_search.google_trends.TrendReq', side_effect=lambda **kwargs: MagicMock()) as mock_trend_req:
+            with GoogleTrendsAPI() as first:
+                first_client = first.trends_client
             
-            # Results should be the same - compare the trend scores directly
-            # Since caching works, the trend scores should match
-            assert result1.query == result2.query
-            # Allow for small floating point differences
-            assert abs(result1.trend_score - result2.trend_score) < 0.01
+            # Closing an instance leaves the pooled client usable by others
+            second = GoogleTrendsAPI()
+        
+        assert second.trends_client is first_client
+        first_client.close.assert_not_called()
+        assert mock_trend_req.call_count == 1
+        second.close()
+    
+    def test_trends_client_pool_drops_finished_threads(self):
+        """Test that a thread's pooled pytrends client goes away with the thread."""
+        with patch('src.ru_search.google_trends.TrendReq', side_effect=lambda **kwargs: MagicMock()):
+            api = GoogleTrendsAPI(trends_client=None)
+            thread = threading.Thread(target=lambda: api.trends_client)
+            thread.start()
+            thread.join()
+        
+        assert thread in _trends_client_pool
+        thread_ref = weakref.ref(thread)
+        del thread
+        gc.collect()
+        
+        assert thread_ref() is None
+        assert len(_trends_client_pool) == 1  # Only the constructing thread's client is left
+        api.close()
     
-    def test_rate_limiting_multiple_calls(self):
+    def test_rate_limiting_multiple_calls(self, google_trends, clock):
         """Test rate limiting with multiple rapid calls."""
-        api = GoogleTrendsAPI()
+        api = google_trends
         
-        start_time = time.time()
+        start_time = clock()
         
         # Make multiple calls that should be rate limited
         for i in range(3):
             api._google_trends_rate_limit()
         
-        end_time = time.time()
+        end_time = clock()
         total_time = end_time - start_time
         
         # Should take at least 2 * request_interval (10 seconds) for 3 calls
@@ -329,48 +454,46 @@ class TestGoogleTrendsErrorConditions:
             with pytest.raises(Exception):
                 GoogleTrendsAPI()
     
-    def test_empty_query_handling(self):
+    def test_empty_query_handling(self, google_trends):
         """Test handling of empty or invalid queries."""
-        api = GoogleTrendsAPI()
+        api = google_trends
         
-        # Test with empty query
-        with patch.object(api.trends_client, 'build_payload') as mock_build, \
-             patch.object(api.trends_client, 'interest_over_time') as mock_interest:
-            
-            mock_interest.return_value = None
-            
-            result = api.get_interest_over_time('')
-            
-            # Should return fallback data
-            assert isinstance(result, TrendData)
-            assert result.trend_score == 0.5
+        # Test with empty query; the client returns no data
+        result = api.get_interest_over_time('')
+        
+        # Should return fallback data
+        assert isinstance(result, TrendData)
+        assert result.trend_score == 0.5
     
-    @patch('time.sleep')
-    def test_api_quota_exceeded(self, mock_sleep):
+    def test_injected_client_skips_trendreq(self, trends_client):
+        """Test that a supplied client is used instead of creating a TrendReq."""
+        with patch('src.ru_search.google_trends.TrendReq') as mock_trend_req:
+            api = GoogleTrendsAPI(trends_client=trends_client)
+        
+        assert api.trends_client is trends_client
+        mock_trend_req.assert_not_called()
+    
+    def test_api_quota_exceeded(self, google_trends, clock):
         """Test behavior when API quota is exceeded."""
-        api = GoogleTrendsAPI()
+        # Start 10 minutes before the end of an hour
+        clock.now = 1_700_002_200.0
+        mock_sleep = MagicMock(side_effect=clock.tick)
+        api = google_trends
+        api._sleep = mock_sleep
         
         # Simulate hitting the hourly limit
         api._hourly_request_count = api.max_requests_per_hour
-        
-        # Mock the current time to be at the end of an hour
-        import time
-        current_time = int(time.time())
-        api._last_hour = current_time // 3600  # Set to current hour
-        
-        start_time = time.time()
+        current_time = clock()
+        api._last_hour = int(current_time // 3600)  # Set to current hour
         
         # This should trigger the rate limiting wait
         api._google_trends_rate_limit()
         
-        end_time = time.time()
-        
         # Verify that sleep was called with the expected duration (seconds until next hour)
         expected_sleep_time = 3600 - (current_time % 3600)
-        if mock_sleep.call_count > 0:
-            actual_sleep_time = mock_sleep.call_args[0][0]
-            # Allow for small timing differences
-            assert abs(actual_sleep_time - expected_sleep_time) < 2  # Within 2 seconds tolerance
+        mock_sleep.assert_called_once_with(expected_sleep_time)
         
-        # The actual time elapsed should be minimal since we're mocking sleep
-        assert end_time - start_time < 1  # Should be much less than 1 second
+        # The quota is reset once the next hour starts
+        assert clock() % 3600 == 0
+        assert api._last_hour == int(current_time // 3600) + 1
+        assert api._hourly_request_count == 1
@@ -9,234 +9,255 @@ This module tests the WildberriesSearch class including:
 - Product normalization
 """
 
+import json
+import re
+import threading
 import pytest
+import requests
+import responses
 import unittest.mock as mock
 import time
-from unittest.mock import patch, MagicMock
-from src.ru_search.wildberries import WildberriesSearch
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from urllib3.util.retry import RequestHistory
+from unittest.mock import MagicMock
+from aioresponses import aioresponses
 from src.ru_search.base import Product
 
+# Skip the module rather than erroring when a scraper dependency is missing;
+# the module handle is also used to patch its globals
+wildberries = pytest.importorskip("src.ru_search.wildberries")
+WildberriesSearch = wildberries.WildberriesSearch
+
+
+# Rate limiting and retry backoff return immediately in every test
+pytestmark = pytest.mark.usefixtures("no_sleep")
+
+
+# Product records as returned by the search API; shared by all tests, never mutated
+PRODUCT_XIAOMI = {
+    'id': 123456,
+    'name': 'Смартфон Xiaomi Redmi Note 10',
+    'salePriceU': 1500000,  # 15,000 rubles in kopecks
+    'priceU': 1800000,    # 18,000 rubles in kopecks
+    'rating': 4.5,
+    'feedback': 125,
+    'brand': 'Xiaomi',
+    'volume': 500,
+    'selling': True,
+    'new': False,
+    'sale': True
+}
+
+PRODUCT_SAMSUNG = {
+    'id': 789012,
+    'name': 'Смартфон Samsung Galaxy A52',
+    'salePriceU': 2500000,  # 25,000 rubles in kopecks
+    'priceU': 2800000,    # 28,000 rubles in kopecks
+    'rating': 4.8,
+    'feedback': 320,
+    'brand': 'Samsung',
+    'volume': 800,
+    'selling': True,
+    'new': True,
+    'sale': False
+}
+
+PRODUCT_MALFORMED = {
+    # Missing required fields - this should cause parsing to fail
+    'id': 789012,
+    'name': None,  # This will cause an error in parsing
+    'salePriceU': None,
+}
+
+
+# Error raised by raise_for_status(), as requests reports it
+SERVER_ERROR = requests.exceptions.HTTPError("500 Server Error: Internal Server Error for url")
+
+# Unpatched transport, for tests exercising retries below the session
+_SESSION_REQUEST = requests.Session.request
+
+# Search API URL with any query string, for aioresponses
+SEARCH_URL_PATTERN = re.compile(r"^https://search\.wb\.ru/exactmatch/ru/common/v4/search\?")
+
+# Headers every request to the search API must carry
+REQUIRED_HEADER_KEYS = frozenset({'User-Agent', 'Accept', 'Referer', 'Origin'})
+
+
+def fake_response(json_data=None, status=200, raise_exc=None):
+    """
+    Create a lightweight stand-in for requests.Response.
+    
+    Much cheaper to build than a MagicMock, which creates child mocks and
+    records calls on every attribute access.
+    """
+    def raise_for_status():
+        if raise_exc is not None:
+            # Drop the traceback of earlier raises of a shared instance
+            raise raise_exc.with_traceback(None)
+    
+    return SimpleNamespace(
+        status_code=status,
+        content=json.dumps(json_data, ensure_ascii=False).encode(),
+        raise_for_status=raise_for_status
+    )
+
+
+@pytest.fixture(autouse=True)
+def mock_request(monkeypatch):
+    """Replace requests.Session.request, which requests.request and requests.get
+    also go through, with a mock, so no test reaches the network."""
+    mock = MagicMock()
+    monkeypatch.setattr(requests.Session, "request", mock)
+    return mock
+
+
+@pytest.fixture
+def real_transport(monkeypatch):
+    """Restore requests.Session.request, for tests mocking at the adapter with responses."""
+    monkeypatch.setattr(requests.Session, "request", _SESSION_REQUEST)
+
+
+@pytest.fixture
+def wb():
+    """Create a WildberriesSearch instance with its own rate limiter."""
+    wb = WildberriesSearch()
+    yield wb
+    wb.close()
+
 
 class TestWildberriesSearch:
     """Test suite for WildberriesSearch class."""
 
-    def setup_method(self):
-        """Setup test fixtures."""
-        self.wb = WildberriesSearch()
+    @pytest.fixture(autouse=True)
+    def _inject(self, wb):
+        """Expose the test's WildberriesSearch instance."""
+        self.wb = wb
         self.test_query = "телефон"
-        
-    def teardown_method(self):
-        """Clean up after tests."""
-        self.wb.close()
 
-    @patch('requests.request')
     def test_search_success(self, mock_request):
         """Test successful search with mock API response."""
         # Mock response data
-        mock_response_data = {
-            'data': {
-                'products': [
-                    {
-                        'id': 123456,
-                        'name': 'Смартфон Xiaomi Redmi Note 10',
-                        'salePriceU': 1500000,  # 15,000 rubles in kopecks
-                        'priceU': 1800000,    # 18,000 rubles in kopecks
-                        'rating': 4.5,
-                        'feedback': 125,
-                        'brand': 'Xiaomi',
-                        'volume': 500,
-                        'selling': True,
-                        'new': False,
-                        'sale': True
-                    },
-                    {
-                        'id': 789012,
-                        'name': 'Смартфон Samsung Galaxy A52',
-                        'salePriceU': 2500000,  # 25,000 rubles in kopecks
-                        'priceU': 2800000,    # 28,000 rubles in kopecks
-                        'rating': 4.8,
-                        'feedback': 320,
-                        'brand': 'Samsung',
-                        'volume': 800,
-                        'selling': True,
-                        'new': True,
-                        'sale': False
-                    }
-                ]
-            }
-        }
+        mock_response_data = {'data': {'products': [PRODUCT_XIAOMI, PRODUCT_SAMSUNG]}}
         
         # Configure mock response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = mock_response_data
-        mock_request.return_value = mock_response
-        
-        # Execute search
-        results = self.wb.search(self.test_query)
-        
-        # Assertions
-        assert len(results) == 2
-        assert all(isinstance(product, Product) for product in results)
-        
-        # Test first product
-        product1 = results[0]
-        assert product1.id == "123456"
-        assert product1.title == "Смартфон Xiaomi Redmi Note 10"
-        assert product1.price == 15000.0
-        assert "123456" in product1.url
-        assert product1.metadata['brand'] == "Xiaomi"
-        assert product1.metadata['rating'] == 4.5
-        assert product1.metadata['reviews_count'] == 125
-        
-        # Test second product
-        product2 = results[1]
-        assert product2.id == "789012"
-        assert product2.title == "Смартфон Samsung Galaxy A52"
-        assert product2.price == 25000.0
-        assert "789012" in product2.url
-        assert product2.metadata['brand'] == "Samsung"
-        
-    @patch('requests.request')
-    def test_search_empty_results(self, mock_request):
-        """Test search with empty results."""
-        # Mock empty response
-        mock_response_data = {'data': {'products': []}}
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = mock_response_data
-        mock_request.return_value = mock_response
+        mock_request.return_value = fake_response(mock_response_data)
         
         # Execute search
         results = self.wb.search(self.test_query)
         
         # Assertions
-        assert len(results) == 0
-        assert results == []
-
-    @patch('requests.request')
-    def test_search_malformed_product(self, mock_request):
-        """Test search with malformed product data."""
-        # Mock response with malformed product
-        mock_response_data = {
-            'data': {
-                'products': [
-                    {
-                        'id': 123456,
-                        'name': 'Смартфон Xiaomi Redmi Note 10',
-                        'salePriceU': 1500000,
-                        'priceU': 1800000,
-                        'rating': 4.5,
-                        'feedback': 125,
-                        'brand': 'Xiaomi',
-                        'volume': 500,
-                        'selling': True,
-                        'new': False,
-                        'sale': True
-                    },
-                    {
-                        # Missing required fields - this should cause parsing to fail
-                        'id': 789012,
-                        'name': None,  # This will cause an error in parsing
-                        'salePriceU': None,
-                    }
-                ]
-            }
-        }
+        got = [
+            (p.id, p.title, p.price, p.metadata['brand'], p.metadata['rating'], p.metadata['reviews_count'])
+            for p in results
+        ]
+        assert got == [
+            ("123456", "Смартфон Xiaomi Redmi Note 10", 15000.0, "Xiaomi", 4.5, 125),
+            ("789012", "Смартфон Samsung Galaxy A52", 25000.0, "Samsung", 4.8, 320),
+        ]
+        assert all(isinstance(p, Product) and p.id in p.url for p in results)
+        
+    @pytest.mark.parametrize("payload, status, raise_exc, expected_ids", [
+        ({'data': {'products': [PRODUCT_XIAOMI, PRODUCT_SAMSUNG]}}, 200, None, ["123456", "789012"]),
+        ({'data': {'products': []}}, 200, None, []),
+        # Malformed products are skipped
+        ({'data': {'products': [PRODUCT_XIAOMI, PRODUCT_MALFORMED]}}, 200, None, ["123456"]),
+        # API errors are reported as search failures
+        (None, 500, SERVER_ERROR, None),
+    ], ids=["success", "empty", "malformed", "api_error"])
+    def test_search_matrix(self, mock_request, payload, status, raise_exc, expected_ids):
+        """Test search with full, empty and malformed results and with API errors."""
+        mock_request.return_value = fake_response(payload, status=status, raise_exc=raise_exc)
+        
+        if expected_ids is None:
+            with pytest.raises(Exception, match=r"^Wildberries search failed: 500 Server Error"):
+                self.wb.search(self.test_query)
+            return
         
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = mock_response_data
-        mock_request.return_value = mock_response
-        
-        # Execute search
         results = self.wb.search(self.test_query)
-        
-        # Should only get the valid product
-        assert len(results) == 1
-        assert results[0].id == "123456"
-
-    @patch('requests.request')
-    def test_search_api_error(self, mock_request):
-        """Test search with API error."""
-        # Mock API error
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_response.raise_for_status.side_effect = Exception("Internal Server Error")
-        mock_request.return_value = mock_response
-        
-        # Execute search and expect exception
-        with pytest.raises(Exception) as exc_info:
-            self.wb.search(self.test_query)
-        
-        assert "Wildberries search failed" in str(exc_info.value)
-
-    @patch('requests.request')
-    @patch('time.sleep')  # Mock sleep to avoid actual waiting
-    def test_search_rate_limiting(self, mock_sleep, mock_request):
+        assert [product.id for product in results] == expected_ids
+
+    @responses.activate
+    def test_search_rate_limiting(self, real_transport):
         """Test rate limiting behavior."""
-        # Mock successful response after retry
-        call_count = 0
-        last_exception = None
-        
-        def mock_request_side_effect(*args, **kwargs):
-            nonlocal call_count, last_exception
-            call_count += 1
-            
-            # First call raises an exception that looks like 429
-            if call_count == 1:
-                mock_response = MagicMock()
-                mock_response.status_code = 429
-                mock_response.json.return_value = {'error': 'Too Many Requests'}
-                # Create an exception with "429" in the message to trigger retry logic
-                last_exception = Exception("429 Client Error: Too Many Requests for url")
-                mock_response.raise_for_status.side_effect = last_exception
-                return mock_response
-            else:
-                # Second call returns success
-                success_response = MagicMock()
-                success_response.status_code = 200
-                success_response.json.return_value = {
-                    'data': {
-                        'products': [{
-                            'id': 123456,
-                            'name': 'Смартфон Xiaomi Redmi Note 10',
-                            'salePriceU': 1500000,
-                            'priceU': 1800000,
-                            'rating': 4.5,
-                            'feedback': 125,
-                            'brand': 'Xiaomi',
-                            'volume': 500,
-                            'selling': True,
-                            'new': False,
-                            'sale': True
-                        }]
-                    }
-                }
-                return success_response
-        
-        mock_request.side_effect = mock_request_side_effect
-        mock_sleep.return_value = None  # Don't actually sleep
+        # First call is rate limited, the retry succeeds
+        responses.get(self.wb.base_url, status=429)
+        responses.get(self.wb.base_url, json={'data': {'products': [PRODUCT_XIAOMI]}})
         
         # Execute search - should succeed after retry
         results = self.wb.search(self.test_query)
         
         # Should succeed after retry
         assert len(results) == 1
-        assert call_count == 2
-        # Verify that sleep was called (for rate limiting)
-        assert mock_sleep.call_count >= 1
+        assert len(responses.calls) == 2
+
+    def test_search_uses_cache(self, mock_request):
+        """Test that repeating a search is served from the response cache when enabled."""
+        mock_request.return_value = fake_response({'data': {'products': [PRODUCT_XIAOMI]}})
+        
+        with WildberriesSearch(response_cache_ttl=600) as wb:
+            first = wb.search(self.test_query)
+            second = wb.search(self.test_query)
+        
+        assert mock_request.call_count == 1
+        assert [product.id for product in second] == [product.id for product in first] == ["123456"]
+
+    def test_search_without_cache_requests_fresh_data(self, mock_request):
+        """Test that repeated searches reach the API when the response cache is off."""
+        mock_request.return_value = fake_response({'data': {'products': [PRODUCT_XIAOMI]}})
+        
+        self.wb.search(self.test_query)
+        self.wb.search(self.test_query)
+        
+        assert self.wb._response_cache is None
+        assert mock_request.call_count == 2
 
-    def test_wildberries_rate_limiting(self):
+    def test_wildberries_rate_limiting(self, no_sleep):
         """Test Wildberries-specific rate limiting."""
+        sleeps = no_sleep
+        
         # Test initial state
-        assert self.wb._last_request_time == 0
+        assert self.wb._tokens == self.wb._capacity
         
         # Call rate limiter
         self.wb._rate_limit()
         
-        # Should update timestamp
-        assert self.wb._last_request_time > 0
+        # Should take a token without waiting
+        assert self.wb._tokens < self.wb._capacity
+        assert sleeps == []
+        
+        # The bucket is empty, so the next call waits for a refill
+        self.wb._rate_limit()
+        assert len(sleeps) == 1
+        assert 0 < sleeps[0] <= 1 / self.wb._rate
+
+    @pytest.mark.parametrize("max_workers", [4, 25])
+    def test_search_threadsafe(self, mock_request, no_sleep, max_workers):
+        """Test concurrent searches from a thread pool against the shared rate limiter."""
+        sleeps = no_sleep
+        
+        sent = []
+        lock = threading.Lock()
+        
+        def request(*args, params, **kwargs):
+            with lock:
+                sent.append(params['query'])
+            return fake_response({'data': {'products': [{**PRODUCT_XIAOMI, 'name': params['query']}]}})
+        
+        mock_request.side_effect = request
+        queries = [f"q{i}" for i in range(100)]
+        
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(self.wb.search, queries))
+        elapsed = time.monotonic() - start
+        
+        # Every search got its own response back
+        assert [[product.title for product in products] for products in results] == [[q] for q in queries]
+        assert sorted(sent) == sorted(queries)
+        # The bucket admits at most capacity + rate * (real + slept) time requests
+        min_sleep = (len(queries) - self.wb._capacity) / self.wb._rate - elapsed
+        assert sum(sleeps) >= min_sleep
 
     def test_get_trends(self):
         """Test get_trends method."""
@@ -249,22 +270,7 @@ class TestWildberriesSearch:
 
     def test_parse_product_data(self):
         """Test product data parsing."""
-        # Test product data parsing
-        product_data = {
-            'id': 123456,
-            'name': 'Смартфон Xiaomi Redmi Note 10',
-            'salePriceU': 1500000,
-            'priceU': 1800000,
-            'rating': 4.5,
-            'feedback': 125,
-            'brand': 'Xiaomi',
-            'volume': 500,
-            'selling': True,
-            'new': False,
-            'sale': True
-        }
-        
-        product = self.wb._parse_product_data(product_data)
+        product = self.wb._parse_product_data(PRODUCT_XIAOMI)
         
         assert product.id == "123456"
         assert product.title == "Смартфон Xiaomi Redmi Note 10"
@@ -275,25 +281,28 @@ class TestWildberriesSearch:
         assert product.metadata['sales_count'] == 500
         assert product.metadata['is_available'] is True
 
+    def test_parse_product_data_defaults(self):
+        """Test that missing optional fields get their default values."""
+        product = self.wb._parse_product_data({'id': 42, 'name': ' Чехол ', 'salePriceU': 9900})
+        
+        assert (product.id, product.title, product.price) == ("42", "Чехол", 99.0)
+        assert product.metadata == {
+            'old_price': 0.0, 'rating': 0, 'reviews_count': 0, 'brand': '', 'sales_count': 0,
+            'is_available': False, 'is_new': False, 'is_sale': False,
+        }
+
     def test_get_headers(self):
         """Test headers generation."""
         headers = self.wb._get_headers()
         
-        assert 'User-Agent' in headers
+        assert REQUIRED_HEADER_KEYS <= headers.keys()
         assert headers['User-Agent'] == 'idea-planner-agent/0.1.0'
-        assert 'Accept' in headers
-        assert 'Referer' in headers
-        assert 'Origin' in headers
         assert headers['Referer'] == 'https://www.wildberries.ru/'
 
-    @patch('requests.request')
     def test_make_request_success(self, mock_request):
         """Test successful request making."""
         # Mock successful response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {'test': 'data'}
-        mock_request.return_value = mock_response
+        mock_request.return_value = fake_response({'test': 'data'})
         
         # Execute request
         result = self.wb._make_request(
@@ -307,33 +316,24 @@ class TestWildberriesSearch:
         assert result['data'] == {'test': 'data'}
         assert 'timestamp' in result
 
-    @patch('requests.request')
-    def test_make_request_retry_success(self, mock_request):
+    def test_make_request_parses_bytes(self, mock_request):
+        """Test that the raw response body is decoded, escapes and all."""
+        mock_request.return_value = SimpleNamespace(
+            status_code=200,
+            content='{"ok": true, "text": "\\u0442\\u0435\\u043b", "name": "Чехол"}'.encode(),
+            raise_for_status=lambda: None
+        )
+        
+        result = self.wb._make_request(url='https://test.com/api', method='GET')
+        
+        assert result['data'] == {'ok': True, 'text': "тел", 'name': "Чехол"}
+
+    @responses.activate
+    def test_make_request_retry_success(self, real_transport):
         """Test request retry logic."""
         # Mock failure then success
-        call_count = 0
-        last_exception = None
-        
-        def mock_request_side_effect(*args, **kwargs):
-            nonlocal call_count, last_exception
-            call_count += 1
-            
-            if call_count == 1:
-                # First call fails with a response that raises exception
-                mock_response = MagicMock()
-                mock_response.status_code = 500
-                mock_response.json.return_value = {'error': 'Server Error'}
-                last_exception = Exception("Server Error")
-                mock_response.raise_for_status.side_effect = last_exception
-                return mock_response
-            else:
-                # Second call succeeds
-                mock_response = MagicMock()
-                mock_response.status_code = 200
-                mock_response.json.return_value = {'test': 'data'}
-                return mock_response
-        
-        mock_request.side_effect = mock_request_side_effect
+        responses.get('https://test.com/api', status=500)
+        responses.get('https://test.com/api', json={'test': 'data'})
         
         # Execute request
         result = self.wb._make_request(
@@ -344,30 +344,55 @@ class TestWildberriesSearch:
         
         # Should succeed after retry
         assert result['source'] == 'wildberries'
-        assert mock_request.call_count == 2
+        assert len(responses.calls) == 2
 
-    @patch('requests.request')
-    def test_make_request_max_retries(self, mock_request):
+    @responses.activate
+    def test_make_request_max_retries(self, real_transport, monkeypatch):
         """Test request max retries."""
+        # The behaviour under test is giving up after max_retries, whatever its value
+        monkeypatch.setattr(self.wb, 'max_retries', 2)
+        
         # Mock consistent failure
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_response.json.return_value = {'error': 'Server Error'}
-        mock_response.raise_for_status.side_effect = Exception("Server Error")
-        mock_request.return_value = mock_response
-        
-        # Execute request and expect exception
-        with pytest.raises(Exception) as exc_info:
+        responses.get('https://test.com/api', status=500)
+        
+        # Execute request and expect exception, worded as in the asynchronous path
+        with pytest.raises(requests.exceptions.RetryError, match=r"^Request failed after 2 attempts: "):
             self.wb._make_request(
                 url='https://test.com/api',
                 method='GET',
                 params={'query': 'test'}
             )
         
-        # Check if the error message contains the expected pattern
-        error_msg = str(exc_info.value)
-        assert "failed after 5 attempts" in error_msg or "Server Error" in error_msg
-        assert mock_request.call_count == 5
+        # max_retries attempts in total, as in the asynchronous path
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_make_request_honours_changed_max_retries(self, real_transport):
+        """Test that changing max_retries after construction changes the attempts made."""
+        responses.get('https://test.com/api', status=403)
+        self.wb.max_retries = 2
+        
+        with pytest.raises(requests.exceptions.RetryError):
+            self.wb._make_request(url='https://test.com/api', method='GET')
+        
+        assert len(responses.calls) == 2
+
+    @pytest.mark.parametrize("status, attempts, expected", [
+        (429, 1, 5),
+        (403, 2, 10),
+        (429, 5, 60),
+        # Other errors get a short exponential backoff
+        (500, 2, 0.2),
+        (None, 3, 0.4),
+    ])
+    def test_retry_backoff(self, status, attempts, expected):
+        """Test the backoff after rate limit and other error responses."""
+        history = tuple(
+            RequestHistory('GET', 'https://test.com/api', None, status, None)
+            for _ in range(attempts)
+        )
+        
+        assert self.wb._retry_policy().new(history=history).get_backoff_time() == pytest.approx(expected)
 
     def test_context_manager(self):
         """Test context manager functionality."""
@@ -378,4 +403,68 @@ class TestWildberriesSearch:
         # Should be able to create and use normally after context
         wb2 = WildberriesSearch()
         assert wb2.source_name == "wildberries"
-        wb2.close()
\ No newline at end of file
+        wb2.close()
+
+    @pytest.mark.asyncio
+    async def test_asearch(self):
+        """Test asynchronous search with a mocked aiohttp response."""
+        with aioresponses() as mocked:
+            mocked.get(SEARCH_URL_PATTERN, payload={'data': {'products': [PRODUCT_XIAOMI, PRODUCT_MALFORMED]}})
+            
+            results = await self.wb.asearch(self.test_query)
+        
+        assert [(product.id, product.price) for product in results] == [("123456", 15000.0)]
+
+    @pytest.mark.asyncio
+    async def test_asearch_many(self):
+        """Test concurrent searches return one result list per query, in order."""
+        with aioresponses() as mocked:
+            mocked.get(re.compile(r".*query=xiaomi"), payload={'data': {'products': [PRODUCT_XIAOMI]}})
+            mocked.get(re.compile(r".*query=samsung"), payload={'data': {'products': [PRODUCT_SAMSUNG]}})
+            
+            results = await self.wb.asearch_many(["xiaomi", "samsung"])
+        
+        assert [[product.id for product in products] for products in results] == [["123456"], ["789012"]]
+
+    @pytest.mark.asyncio
+    async def test_asearch_many_rate_limited_on_event_loop(self, no_sleep):
+        """Test that concurrent searches wait for the rate limiter without blocking sleeps."""
+        thread_sleeps = no_sleep
+        loop_sleep = mock.AsyncMock()
+        
+        with WildberriesSearch(async_sleep_func=loop_sleep) as wb, aioresponses() as mocked:
+            mocked.get(SEARCH_URL_PATTERN, payload={'data': {'products': [PRODUCT_XIAOMI]}}, repeat=True)
+            
+            results = await wb.asearch_many(["q0", "q1", "q2"])
+        
+        assert len(results) == 3
+        assert thread_sleeps == []
+        # The first request takes the available token, the others are spaced 1 second apart
+        waits = sorted(call.args[0] for call in loop_sleep.await_args_list)
+        assert waits == pytest.approx([1, 2], abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_asearch_api_error(self):
+        """Test asynchronous search gives up after the retries are exhausted."""
+        loop_sleep = mock.AsyncMock()
+        
+        with WildberriesSearch(async_sleep_func=loop_sleep) as wb, aioresponses() as mocked:
+            wb.max_retries = 2
+            mocked.get(SEARCH_URL_PATTERN, status=500, repeat=True)
+            
+            with pytest.raises(Exception, match=r"^Wildberries search failed: Request failed after 2 attempts"):
+                await wb.asearch(self.test_query)
+        
+        # One backoff, between the two attempts
+        loop_sleep.assert_awaited_once_with(0.1)
+
+    @pytest.mark.asyncio
+    async def test_asearch_client_error_not_retried(self):
+        """Test that asynchronous search fails at once on a status the sync adapter does not retry."""
+        with aioresponses() as mocked:
+            mocked.get(SEARCH_URL_PATTERN, status=404, repeat=True)
+            
+            with pytest.raises(Exception, match=r"^Wildberries search failed: 404"):
+                await self.wb.asearch(self.test_query)
+            
+            assert sum(len(calls) for calls in mocked.requests.values()) == 1
@@ -10,101 +10,144 @@ This module tests the YandexSearch class including:
 - Trend data generation
 """
 
+import numpy as np
 import pytest
+import responses
 import unittest.mock as mock
 import time
-from unittest.mock import patch, MagicMock
 from src.ru_search.yandex import YandexSearch
 from src.ru_search.base import Product, TrendData
 
 
+# Rate limiting and retry backoff return immediately in every test
+pytestmark = pytest.mark.usefixtures("no_sleep")
+
+
+SEARCH_URL = "https://market.yandex.ru/search"
+TEST_API_URL = "https://test.com/api"
+
+
+# Keys of each month of Wordstat historical data
+HISTORICAL_DATA_KEYS = frozenset({'month', 'search_volume', 'trend_index'})
+
+
+def assert_historical_data(historical_data):
+    """Check the structure and value ranges of a year of Wordstat historical data."""
+    assert len(historical_data) == 12
+    assert all(HISTORICAL_DATA_KEYS <= data_point.keys() for data_point in historical_data)
+    
+    # Value checks run over whole arrays rather than point by point
+    volumes = np.fromiter((data_point['search_volume'] for data_point in historical_data), dtype=np.int64)
+    indices = np.fromiter((data_point['trend_index'] for data_point in historical_data), dtype=np.float64)
+    assert np.all(volumes > 0)
+    assert np.all(np.isfinite(indices) & (indices >= 0.0))
+
+
+def product_card(product_id=None, title=None, price=None, rating=None, reviews=None, brand=None):
+    """
+    Render a Yandex Market product card as the scraper expects it.
+    
+    Fields left as None are left out of the card.
+    """
+    parts = []
+    if product_id is not None:
+        parts.append(f'<a class="n-snippet-card2__title" href="/product/{product_id}?track=srch"></a>')
+    if title is not None:
+        parts.append(f'<h3 class="n-snippet-card2__title">{title}</h3>')
+    if price is not None:
+        parts.append(f'<div class="n-snippet-card2__price">{price}</div>')
+    if rating is not None:
+        parts.append(f'<div class="n-snippet-card2__rating">{rating}</div>')
+    if reviews is not None:
+        parts.append(f'<span class="n-snippet-card2__rating-count">{reviews}</span>')
+    if brand is not None:
+        parts.append(f'<div class="n-snippet-card2__brand">{brand}</div>')
+    return f'<div class="n-snippet-card2">{"".join(parts)}</div>'
+
+
+def search_page(*cards):
+    """Render a search results page holding the given product cards."""
+    return f'<html><body><div class="search-results">{"".join(cards)}</div></body></html>'
+
+
+CARD_XIAOMI = product_card(
+    '123456', 'Смартфон Xiaomi Redmi Note 10', '15 000 ₽', '4.5', '125 отзывов', 'Xiaomi'
+)
+CARD_SAMSUNG = product_card(
+    '789012', 'Смартфон Samsung Galaxy A52', '25 000 ₽', '4.8', '320 отзывов', 'Samsung'
+)
+# Only the fields a product cannot do without
+CARD_XIAOMI_MINIMAL = product_card('123456', 'Смартфон Xiaomi Redmi Note 10', '15 000 ₽')
+# Missing URL, should be skipped
+CARD_NO_URL = product_card(title='Без ссылки', price='1 000 ₽')
+
+
+@pytest.fixture(scope="module")
+def http():
+    """
+    Intercept requests made by this module's tests with one RequestsMock.
+    
+    The mock is installed once for the whole module rather than per test;
+    unregistered URLs raise ConnectionError, so nothing reaches the network.
+    """
+    mock_http = responses.RequestsMock(assert_all_requests_are_fired=False)
+    mock_http.start()
+    yield mock_http
+    mock_http.stop()
+
+
+@pytest.fixture(autouse=True)
+def _reset_http(http):
+    """Drop the responses and calls recorded by the previous test."""
+    http.reset()
+
+
+@pytest.fixture
+def api(http):
+    """
+    Program TEST_API_URL to answer with a sequence of (status, body) responses.
+    
+    Returns the register function; the responses are served in order, and
+    the test fails if any of them is never requested.
+    """
+    def register(sequence):
+        for status, body in sequence:
+            http.get(TEST_API_URL, json=body, status=status)
+        return http
+    
+    yield register
+    
+    unfired = [match.url for match in http.registered() if match.call_count == 0]
+    assert not unfired, f"Responses never requested: {unfired}"
+
+
+@pytest.fixture(scope="class")
+def yandex():
+    """Create a YandexSearch instance shared by all tests of a class."""
+    yandex = YandexSearch()
+    yield yandex
+    yandex.close()
+
+
 class TestYandexSearch:
     """Test suite for YandexSearch class."""
 
-    def setup_method(self):
-        """Setup test fixtures."""
-        self.yandex = YandexSearch()
+    @pytest.fixture(autouse=True)
+    def _inject(self, yandex):
+        """Expose the shared YandexSearch instance with its rate limiting state reset."""
+        # Tests check the limiter's state from scratch, and would otherwise
+        # also be throttled by the requests of the one before them
+        yandex._request_timestamp = 0
+        yandex._minute_request_count = 0
+        yandex._last_minute = 0
+        yandex._request_count = 0
+        yandex._last_request_time = 0
+        self.yandex = yandex
         self.test_query = "телефон"
-        
-    def teardown_method(self):
-        """Clean up after tests."""
-        self.yandex.close()
-
-    @patch('requests.get')
-    @patch('bs4.BeautifulSoup')
-    @pytest.mark.skip(reason="Scraping not reliable for MVP")
-    def test_scrape_yandex_market_success(self, mock_soup, mock_get):
+
+    def test_scrape_yandex_market_success(self, http):
         """Test successful Yandex Market scraping."""
-        # Mock BeautifulSoup to return product containers
-        mock_container1 = MagicMock()
-        mock_container2 = MagicMock()
-        
-        # Mock product URL tag
-        mock_url_tag1 = MagicMock()
-        mock_url_tag1.get.return_value = 'https://market.yandex.ru/product/123456'
-        mock_url_tag1.get_text.return_value = 'Смартфон Xiaomi Redmi Note 10'
-        
-        mock_url_tag2 = MagicMock()
-        mock_url_tag2.get.return_value = 'https://market.yandex.ru/product/789012'
-        mock_url_tag2.get_text.return_value = 'Смартфон Samsung Galaxy A52'
-        
-        # Mock price tag
-        mock_price_tag1 = MagicMock()
-        mock_price_tag1.get_text.return_value = '15 000 ₽'
-        
-        mock_price_tag2 = MagicMock()
-        mock_price_tag2.get_text.return_value = '25 000 ₽'
-        
-        # Mock rating tag
-        mock_rating_tag1 = MagicMock()
-        mock_rating_tag1.get_text.return_value = '4.5'
-        
-        mock_rating_tag2 = MagicMock()
-        mock_rating_tag2.get_text.return_value = '4.8'
-        
-        # Mock reviews tag
-        mock_reviews_tag1 = MagicMock()
-        mock_reviews_tag1.get_text.return_value = '125 отзывов'
-        
-        mock_reviews_tag2 = MagicMock()
-        mock_reviews_tag2.get_text.return_value = '320 отзывов'
-        
-        # Mock brand tag
-        mock_brand_tag1 = MagicMock()
-        mock_brand_tag1.get_text.return_value = 'Xiaomi'
-        
-        mock_brand_tag2 = MagicMock()
-        mock_brand_tag2.get_text.return_value = 'Samsung'
-        
-        # Configure container find methods
-        mock_container1.find.side_effect = lambda tag, class_: {
-            ('a', 'n-snippet-card2__title'): mock_url_tag1,
-            ('h3', 'n-snippet-card2__title'): mock_url_tag1,
-            ('div', 'n-snippet-card2__price'): mock_price_tag1,
-            ('div', 'n-snippet-card2__rating'): mock_rating_tag1,
-            ('span', 'n-snippet-card2__rating-count'): mock_reviews_tag1,
-            ('div', 'n-snippet-card2__brand'): mock_brand_tag1
-        }.get((tag, class_), None)
-        
-        mock_container2.find.side_effect = lambda tag, class_: {
-            ('a', 'n-snippet-card2__title'): mock_url_tag2,
-            ('h3', 'n-snippet-card2__title'): mock_url_tag2,
-            ('div', 'n-snippet-card2__price'): mock_price_tag2,
-            ('div', 'n-snippet-card2__rating'): mock_rating_tag2,
-            ('span', 'n-snippet-card2__rating-count'): mock_reviews_tag2,
-            ('div', 'n-snippet-card2__brand'): mock_brand_tag2
-        }.get((tag, class_), None)
-        
-        # Mock BeautifulSoup find_all to return our containers
-        mock_soup_instance = MagicMock()
-        mock_soup_instance.find_all.return_value = [mock_container1, mock_container2]
-        mock_soup.return_value = mock_soup_instance
-        
-        # Mock successful response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.text = '<html><body>test</body></html>'
-        mock_get.return_value = mock_response
+        http.get(SEARCH_URL, body=search_page(CARD_XIAOMI, CARD_SAMSUNG))
         
         # Execute scraping
         results = self.yandex._scrape_yandex_market(self.test_query)
@@ -131,131 +174,56 @@ class TestYandexSearch:
         assert "market.yandex.ru/product/789012" in product2.url
         assert product2.metadata['brand'] == "Samsung"
 
-    @patch('requests.get')
-    def test_scrape_yandex_market_empty_results(self, mock_get):
+    def test_scrape_yandex_market_empty_results(self, http):
         """Test scraping with empty results."""
-        # Mock HTML with no product containers
-        mock_html = """
+        # HTML with no product containers
+        http.get(SEARCH_URL, body="""
         <html>
             <body>
                 <div>No products found</div>
             </body>
         </html>
-        """
+        """)
         
-        # Mock BeautifulSoup to return no containers
-        with patch('bs4.BeautifulSoup') as mock_soup:
-            mock_soup_instance = MagicMock()
-            mock_soup_instance.find_all.return_value = []
-            mock_soup.return_value = mock_soup_instance
-            
-            # Mock successful response
-            mock_response = MagicMock()
-            mock_response.status_code = 200
-            mock_response.text = mock_html
-            mock_get.return_value = mock_response
-            
-            # Execute scraping
-            results = self.yandex._scrape_yandex_market(self.test_query)
-            
-            # Assertions
-            assert len(results) == 0
-            assert results == []
-
-    @patch('requests.get')
-    @pytest.mark.skip(reason="Scraping not reliable for MVP")
-    def test_scrape_yandex_market_malformed_product(self, mock_get):
-        """Test scraping with malformed product data."""
-        # Mock BeautifulSoup to return product containers
-        mock_container1 = MagicMock()
-        mock_container2 = MagicMock()
-        
-        # Mock first container with valid data
-        mock_url_tag1 = MagicMock()
-        mock_url_tag1.get.return_value = 'https://market.yandex.ru/product/123456'
-        mock_url_tag1.get_text.return_value = 'Смартфон Xiaomi Redmi Note 10'
-        
-        mock_price_tag1 = MagicMock()
-        mock_price_tag1.get_text.return_value = '15 000 ₽'
+        # Execute scraping
+        results = self.yandex._scrape_yandex_market(self.test_query)
         
-        mock_container1.find.side_effect = lambda tag, class_: {
-            ('a', 'n-snippet-card2__title'): mock_url_tag1,
-            ('h3', 'n-snippet-card2__title'): mock_url_tag1,
-            ('div', 'n-snippet-card2__price'): mock_price_tag1
-        }.get((tag, class_), None)
+        # Assertions
+        assert results == []
+
+    def test_scrape_yandex_market_malformed_product(self, http):
+        """Test scraping with malformed product data."""
+        http.get(SEARCH_URL, body=search_page(CARD_XIAOMI_MINIMAL, CARD_NO_URL))
         
-        # Mock second container with missing URL (should be skipped)
-        mock_container2.find.return_value = None
+        # Execute scraping
+        results = self.yandex._scrape_yandex_market(self.test_query)
         
-        # Mock BeautifulSoup find_all to return our containers
-        with patch('bs4.BeautifulSoup') as mock_soup:
-            mock_soup_instance = MagicMock()
-            mock_soup_instance.find_all.return_value = [mock_container1, mock_container2]
-            mock_soup.return_value = mock_soup_instance
-            
-            # Mock successful response
-            mock_response = MagicMock()
-            mock_response.status_code = 200
-            mock_response.text = '<html><body>test</body></html>'
-            mock_get.return_value = mock_response
-            
-            # Execute scraping
-            results = self.yandex._scrape_yandex_market(self.test_query)
-            
-            # Should only get the valid product
-            assert len(results) == 1
-            assert results[0].id == "123456"
-
-    @patch('requests.get')
-    def test_scrape_yandex_market_error(self, mock_get):
+        # Should only get the valid product
+        assert len(results) == 1
+        assert results[0].id == "123456"
+
+    def test_scrape_yandex_market_error(self, http):
         """Test scraping with request error."""
         # Mock request error
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_response.raise_for_status.side_effect = Exception("Internal Server Error")
-        mock_get.return_value = mock_response
+        http.get(SEARCH_URL, status=500)
         
         # Execute scraping and expect exception
-        with pytest.raises(Exception) as exc_info:
+        # The failure comes from the real raise_for_status() of the 500 response
+        with pytest.raises(Exception, match=r"^Yandex Market scraping failed: 500 Server Error"):
             self.yandex._scrape_yandex_market(self.test_query)
-        
-        assert "Yandex Market scraping failed" in str(exc_info.value)
 
-    @patch('requests.get')
-    def test_search_rate_limiting(self, mock_get):
+    def test_search_rate_limiting(self, http):
         """Test rate limiting behavior."""
-        # Mock 429 response
-        mock_response = MagicMock()
-        mock_response.status_code = 429
-        mock_response.raise_for_status.side_effect = Exception("429 Too Many Requests")
-        mock_get.return_value = mock_response
-        
-        # Mock successful response after retry
-        def mock_get_side_effect(*args, **kwargs):
-            if mock_get.call_count == 1:
-                # First call returns 429
-                return mock_response
-            else:
-                # Second call returns success
-                success_response = MagicMock()
-                success_response.status_code = 200
-                success_response.text = '<html><body>test</body></html>'
-                return success_response
+        # First call is rate limited, the retry succeeds with no products
+        http.get(SEARCH_URL, status=429)
+        http.get(SEARCH_URL, body='<html><body>test</body></html>')
         
-        mock_get.side_effect = mock_get_side_effect
+        # Execute search
+        results = self.yandex.search(self.test_query)
         
-        # Mock BeautifulSoup to return empty results
-        with patch('bs4.BeautifulSoup') as mock_soup:
-            mock_soup_instance = MagicMock()
-            mock_soup_instance.find_all.return_value = []
-            mock_soup.return_value = mock_soup_instance
-            
-            # Execute search
-            results = self.yandex.search(self.test_query)
-            
-            # Should succeed after retry
-            assert len(results) == 0
-            assert mock_get.call_count == 2
+        # Should succeed after retry
+        assert len(results) == 0
+        assert len(http.calls) == 2
 
     def test_yandex_rate_limiting(self):
         """Test Yandex-specific rate limiting."""
@@ -278,35 +246,26 @@ class TestYandexSearch:
         assert trend_data.query == self.test_query
         assert isinstance(trend_data.trend_score, float)
         assert 0.0 <= trend_data.trend_score <= 0.9
-        assert len(trend_data.historical_data) == 12
-        
-        # Test historical data structure
-        for data_point in trend_data.historical_data:
-            assert 'month' in data_point
-            assert 'search_volume' in data_point
-            assert 'trend_index' in data_point
+        assert_historical_data(trend_data.historical_data)
 
-    def test_generate_wordstat_stub_data(self):
+    # Expected score: 0.3 + min(len(query) / 20, 0.4), plus 0.1 with a product term
+    @pytest.mark.parametrize("query, expected_score", [
+        ("телефон", 0.65),
+        ("беспроводные наушники", 0.7),
+        ("топ", 0.55),
+        ("купить телефон дешево", 0.8),
+        ("лучший смартфон 2023", 0.8),
+        ("телефон скидка распродажа", 0.8),
+        ("КУПИТЬ ТЕЛЕФОН", 0.8),
+    ])
+    def test_generate_wordstat_stub_data(self, query, expected_score):
         """Test stub data generation for trends."""
-        # Test with different queries
-        test_queries = [
-            "телефон",
-            "купить телефон дешево",
-            "лучший смартфон 2023",
-            "телефон скидка распродажа"
-        ]
+        trend_data = self.yandex._generate_wordstat_stub_data(query)
         
-        for query in test_queries:
-            trend_data = self.yandex._generate_wordstat_stub_data(query)
-            
-            assert trend_data.query == query
-            assert isinstance(trend_data.trend_score, float)
-            assert 0.0 <= trend_data.trend_score <= 0.9
-            assert len(trend_data.historical_data) == 12
-            
-            # Test that longer queries and queries with product terms get higher scores
-            if "купить" in query.lower() or "дешево" in query.lower() or "скидка" in query.lower():
-                assert trend_data.trend_score > 0.5
+        assert trend_data.query == query
+        assert isinstance(trend_data.trend_score, float)
+        assert trend_data.trend_score == pytest.approx(expected_score)
+        assert_historical_data(trend_data.historical_data)
 
     def test_get_headers(self):
         """Test headers generation."""
@@ -318,18 +277,25 @@ class TestYandexSearch:
         assert 'Origin' in headers
         assert headers['Referer'] == 'https://market.yandex.ru/'
 
-    @patch('requests.request')
-    def test_make_request_success(self, mock_request):
+    def test_get_headers_returns_fresh_dict(self):
+        """Test that repeated calls differ at most in User-Agent and share no dict."""
+        headers = self.yandex._get_headers()
+        headers['Authorization'] = "Bearer token"
+        
+        next_headers = self.yandex._get_headers()
+        assert next_headers is not headers
+        assert next_headers['User-Agent'] in self.yandex.user_agents
+        assert {**next_headers, 'User-Agent': None} == {**self.yandex._get_headers(), 'User-Agent': None}
+        assert 'Authorization' not in next_headers
+
+    def test_make_request_success(self, api):
         """Test successful request making."""
         # Mock successful response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {'test': 'data'}
-        mock_request.return_value = mock_response
+        api([(200, {'test': 'data'})])
         
         # Execute request
         result = self.yandex._make_request(
-            url='https://test.com/api',
+            url=TEST_API_URL,
             method='GET',
             params={'query': 'test'}
         )
@@ -339,61 +305,37 @@ class TestYandexSearch:
         assert result['data'] == {'test': 'data'}
         assert 'timestamp' in result
 
-    @patch('requests.request')
-    def test_make_request_retry_success(self, mock_request):
+    def test_make_request_retry_success(self, api):
         """Test request retry logic."""
         # Mock failure then success
-        call_count = 0
-        
-        def mock_request_side_effect(*args, **kwargs):
-            nonlocal call_count
-            call_count += 1
-            
-            if call_count == 1:
-                # First call fails
-                mock_response = MagicMock()
-                mock_response.status_code = 500
-                mock_response.raise_for_status.side_effect = Exception("Server Error")
-                return mock_response
-            else:
-                # Second call succeeds
-                mock_response = MagicMock()
-                mock_response.status_code = 200
-                mock_response.json.return_value = {'test': 'data'}
-                return mock_response
-        
-        mock_request.side_effect = mock_request_side_effect
+        rsps = api([(500, {}), (200, {'test': 'data'})])
         
         # Execute request
         result = self.yandex._make_request(
-            url='https://test.com/api',
+            url=TEST_API_URL,
             method='GET',
             params={'query': 'test'}
         )
         
         # Should succeed after retry
         assert result['source'] == 'yandex'
-        assert mock_request.call_count == 2
+        assert result['data'] == {'test': 'data'}
+        assert len(rsps.calls) == 2
 
-    @patch('requests.request')
-    def test_make_request_max_retries(self, mock_request):
+    def test_make_request_max_retries(self, api):
         """Test request max retries."""
-        # Mock consistent failure
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_response.raise_for_status.side_effect = Exception("Server Error")
-        mock_request.return_value = mock_response
+        # Mock consistent failure, one response per attempt
+        rsps = api([(500, {})] * self.yandex.max_retries)
         
         # Execute request and expect exception
-        with pytest.raises(Exception) as exc_info:
+        with pytest.raises(Exception, match=r"^Yandex request failed after 5 attempts: 500 Server Error"):
             self.yandex._make_request(
-                url='https://test.com/api',
+                url=TEST_API_URL,
                 method='GET',
                 params={'query': 'test'}
             )
         
-        assert "Yandex request failed after 5 attempts" in str(exc_info.value)
-        assert mock_request.call_count == 5
+        assert len(rsps.calls) == 5
 
     def test_context_manager(self):
         """Test context manager functionality."""